@@ -1,43 +1,121 @@
 #!/usr/bin/env python3
 """
-Databricks JDBC Connection Manager
-Provides secure JDBC connectivity to Databricks with data creation capabilities.
+Databricks Connection Manager
+Provides secure connectivity to Databricks with data creation capabilities.
+Uses the native databricks-sql connector (Thrift + Arrow); JDBC is available via use_jdbc=True.
 """
 
 import os
-import sys
 import json
+import atexit
+import uuid
+import queue
+import tempfile
+import threading
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from dotenv import load_dotenv
+from databricks import sql
 
-# Load JDBC driver requirements
-try:
-    import jaydebeapi
-except ImportError:
-    print("jaydebeapi not installed. Install with: pip install jaydebeapi")
-    sys.exit(1)
+from schema_cache import SchemaCache
 
-try:
-    import jpype
-except ImportError:
-    print("jpype1 not installed. Install with: pip install jpype1")
-    sys.exit(1)
+# Databricks caps the number of parameter markers in a single statement
+MAX_STATEMENT_PARAMETERS = 256
+
+# Row count above which inserts go through a staged Parquet COPY INTO
+BULK_LOAD_THRESHOLD = 1000
+
+# Analysis query templates, specialized per table once by _query(). Reusing
+# the exact same text on every call also lets the warehouse hit its result cache.
+QUERY_TEMPLATES = {
+    # Channel performance
+    'channel_performance': """
+        SELECT 
+            channel,
+            SUM(impressions) as total_impressions,
+            SUM(clicks) as total_clicks,
+            SUM(conversions) as total_conversions,
+            SUM(revenue) as total_revenue,
+            SUM(cost) as total_cost,
+            ROUND(SUM(clicks) / SUM(impressions) * 100, 2) as ctr_percent,
+            ROUND(SUM(conversions) / SUM(clicks) * 100, 2) as conversion_rate,
+            ROUND(SUM(revenue) / SUM(cost), 2) as roas
+        FROM {table}
+        GROUP BY channel
+        ORDER BY total_revenue DESC
+    """,
+    # Regional analysis
+    'regional_performance': """
+        SELECT 
+            region,
+            COUNT(*) as campaigns,
+            SUM(revenue) as total_revenue,
+            AVG(conversions * 100.0 / NULLIF(clicks, 0)) as avg_conversion_rate,
+            ROUND(SUM(clicks) * 100.0 / NULLIF(SUM(impressions), 0), 2) as ctr_percent,
+            ROUND(SUM(revenue) / NULLIF(SUM(cost), 0), 2) as roas
+        FROM {table}
+        GROUP BY region
+        ORDER BY total_revenue DESC
+    """,
+    # Age group insights
+    'age_group_insights': """
+        SELECT 
+            age_group,
+            SUM(revenue) as total_revenue,
+            AVG(cost) as avg_cost,
+            COUNT(*) as campaign_count,
+            ROUND(SUM(revenue) / NULLIF(SUM(cost), 0), 2) as roas
+        FROM {table}
+        GROUP BY age_group
+        ORDER BY total_revenue DESC
+    """
+}
+
+
+@lru_cache(maxsize=None)
+def _query(name: str, table_name: str) -> str:
+    """Return the named query specialized for a table."""
+    return QUERY_TEMPLATES[name].format(table=table_name)
 
 
 class DatabricksJDBCManager:
-    """Manages JDBC connections to Databricks with auto-retry and connection pooling."""
+    """Manages connections to Databricks with auto-retry and connection pooling."""
     
-    def __init__(self, env_file: str = ".env"):
-        """Initialize with environment configuration."""
+    def __init__(self, env_file: str = ".env", use_jdbc: bool = False):
+        """Initialize with environment configuration.
+        
+        The native databricks-sql connector is used by default. Set use_jdbc
+        to go through jaydebeapi and the Databricks JDBC driver instead.
+        """
         # Load environment variables
         load_dotenv(env_file)
         
         self.token = os.getenv("TOKEN")
         self.host = os.getenv("DATABRICKS_HOST", "").replace("https://", "")
         self.http_path = os.getenv("DATABRICKS_HTTP_PATH")
+        self.use_jdbc = use_jdbc
+        
+        # Unity Catalog volume used to stage bulk loads, e.g. /Volumes/catalog/schema/staging
+        self.staging_volume = os.getenv("DATABRICKS_STAGING_VOLUME")
+        
+        if use_jdbc:
+            self._init_jdbc_config()
+        
+        self._connection = None
+        self.schema_cache = SchemaCache()
+        
+        # Connections for concurrent queries, opened lazily up to pool_size
+        self.pool_size = 3
+        self._pool = queue.Queue()
+        self._pool_connections = []
+        self._pool_opened = 0
+        self._pool_lock = threading.Lock()
         
+    def _init_jdbc_config(self):
+        """Resolve JDBC URL, driver and connection properties."""
         # Get JDBC URL from env or construct it
         self.jdbc_url = os.getenv("DATABRICKS_JDBC_URL")
         if not self.jdbc_url and self.host and self.http_path and self.token:
@@ -54,8 +132,9 @@ class DatabricksJDBCManager:
             "PWD": self.token,
             "AuthMech": "3"
         }
-        
-        self._connection = None
+        if self.staging_volume:
+            # PUT may only read local files from these paths
+            self.connection_props["StagingAllowedLocalPaths"] = tempfile.gettempdir()
         
     def _get_jdbc_driver_path(self) -> str:
         """Get JDBC driver path, download if needed."""
@@ -72,67 +151,195 @@ class DatabricksJDBCManager:
             
         return str(driver_path)
         
+    def _open_connection(self):
+        """Open a new driver connection (native by default, JDBC if configured)."""
+        if self.use_jdbc:
+            return self._open_jdbc_connection()
+            
+        return sql.connect(
+            server_hostname=self.host,
+            http_path=self.http_path,
+            access_token=self.token,
+            user_agent_entry="DI4Marketing-Client",
+            # PUT may only read local files from this path
+            staging_allowed_local_path=tempfile.gettempdir() if self.staging_volume else None
+        )
+        
+    def _open_jdbc_connection(self):
+        """Open a JDBC connection, starting the JVM on first use."""
+        import jaydebeapi
+        import jpype
+        
+        if not Path(self.jdbc_driver_path).exists():
+            raise FileNotFoundError(f"JDBC driver not found: {self.jdbc_driver_path}")
+            
+        # Initialize JVM if not already started; pool members and later
+        # manager instances share it. A JVM cannot be restarted in-process,
+        # so it lives until interpreter exit.
+        if not jpype.isJVMStarted():
+            jpype.startJVM(jpype.getDefaultJVMPath(), f"-Djava.class.path={self.jdbc_driver_path}")
+            atexit.register(jpype.shutdownJVM)
+        
+        return jaydebeapi.connect(
+            jclassname=self.driver_class,
+            url=self.jdbc_url,
+            driver_args={
+                "PWD": self.token,
+                "UID": "token",
+                **self.connection_props
+            },
+            jars=[self.jdbc_driver_path]
+        )
+        
     def connect(self) -> bool:
-        """Establish JDBC connection to Databricks."""
+        """Establish connection to Databricks."""
         try:
-            if not Path(self.jdbc_driver_path).exists():
-                raise FileNotFoundError(f"JDBC driver not found: {self.jdbc_driver_path}")
-                
             print("🔌 Connecting to Databricks...")
-            
-            # Initialize JVM if not already started
-            if not jpype.isJVMStarted():
-                jpype.startJVM(jpype.getDefaultJVMPath(), f"-Djava.class.path={self.jdbc_driver_path}")
-            
-            # Create connection
-            self._connection = jaydebeapi.connect(
-                jclassname=self.driver_class,
-                url=self.jdbc_url,
-                driver_args={
-                    "PWD": self.token,
-                    "UID": "token",
-                    **self.connection_props
-                },
-                jars=[self.jdbc_driver_path]
-            )
-            
+            self._connection = self._open_connection()
             print("✅ Connected to Databricks successfully!")
             return True
             
+        except ImportError:
+            print("jaydebeapi/jpype1 not installed. Install with: pip install jaydebeapi jpype1")
+            return False
         except Exception as e:
             print(f"❌ Connection failed: {e}")
             return False
             
     def disconnect(self):
-        """Close JDBC connection."""
+        """Close connection and any pooled connections."""
         if self._connection:
             try:
                 self._connection.close()
                 print("🔌 Disconnected from Databricks")
             except Exception as e:
                 print(f"⚠️  Disconnect error: {e}")
+            self._connection = None
+            
+        while self._pool_connections:
+            try:
+                self._pool_connections.pop().close()
+            except Exception as e:
+                print(f"⚠️  Disconnect error: {e}")
+        self._pool = queue.Queue()
+        self._pool_opened = 0
                 
-        if jpype.isJVMStarted():
-            jpype.shutdownJVM()
+    def _fetch_dataframe(self, cursor) -> pd.DataFrame:
+        """Fetch the cursor's full result set as a DataFrame."""
+        # Prefer the columnar Arrow path, which skips building a Python
+        # object per cell; the JDBC cursor has no Arrow API and falls back to rows.
+        # Either way columns stay Arrow-backed, so strings are not boxed as
+        # Python objects and numeric columns keep their warehouse types.
+        # Check the capability up front: an error while converting must not
+        # fall back to fetchall() on a cursor that has already been read.
+        if hasattr(cursor, "fetchall_arrow"):
+            return cursor.fetchall_arrow().to_pandas(types_mapper=pd.ArrowDtype)
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        results = cursor.fetchall()
+        return pd.DataFrame(results, columns=columns).convert_dtypes(dtype_backend="pyarrow")
             
-    def execute_query(self, query: str) -> Optional[pd.DataFrame]:
-        """Execute SQL query and return results as DataFrame."""
+    def execute_query(self, query: str, params: Optional[List[Any]] = None) -> Optional[pd.DataFrame]:
+        """Execute SQL query and return results as DataFrame.
+        
+        Pass varying values (filters, drill-down keys) as params bound to `?`
+        markers rather than formatting them into the text: the statement text
+        stays identical across calls, so the warehouse can reuse its plan and
+        result cache.
+        """
         if not self._connection:
             if not self.connect():
                 return None
                 
         try:
             cursor = self._connection.cursor()
-            cursor.execute(query)
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            df = self._fetch_dataframe(cursor)
+            cursor.close()
             
-            # Get column names
+            print(f"✅ Query executed successfully. {len(df)} rows returned.")
+            return df
+            
+        except Exception as e:
+            print(f"❌ Query failed: {e}")
+            return None
+            
+    def execute_query_batched(self, query: str, batch_size: int = 10_000) -> Iterator[pd.DataFrame]:
+        """Execute SQL query and yield results as DataFrames of up to batch_size rows.
+        
+        Only one batch is held in memory at a time, so large results can be
+        streamed or aggregated chunk by chunk; pd.concat() recovers the full frame.
+        """
+        if not self._connection:
+            if not self.connect():
+                return
+                
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(query)
             columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            fetchmany_arrow = getattr(cursor, "fetchmany_arrow", None)
+            
+            while True:
+                if fetchmany_arrow is not None:
+                    batch = fetchmany_arrow(batch_size)
+                    if batch.num_rows == 0:
+                        break
+                    yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+                else:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield pd.DataFrame(rows, columns=columns).convert_dtypes(dtype_backend="pyarrow")
+                    
+        except Exception as e:
+            print(f"❌ Query failed: {e}")
+            
+        finally:
+            cursor.close()
+            
+    def _acquire_pooled_connection(self):
+        """Take an idle pooled connection, opening one lazily up to pool_size."""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
             
-            # Fetch results
-            results = cursor.fetchall()
+        with self._pool_lock:
+            can_open = self._pool_opened < self.pool_size
+            if can_open:
+                # Reserve the slot before the (slow) connect
+                self._pool_opened += 1
+                
+        if not can_open:
+            return self._pool.get()
             
-            # Convert to DataFrame
-            df = pd.DataFrame(results, columns=columns)
+        try:
+            connection = self._open_connection()
+        except Exception:
+            with self._pool_lock:
+                self._pool_opened -= 1
+            raise
+        self._pool_connections.append(connection)
+        return connection
+        
+    def execute_query_pooled(self, query: str, params: Optional[List[Any]] = None) -> Optional[pd.DataFrame]:
+        """Execute SQL query on a pooled connection; safe to call from worker threads."""
+        try:
+            connection = self._acquire_pooled_connection()
+        except Exception as e:
+            print(f"❌ Connection failed: {e}")
+            return None
+            
+        try:
+            cursor = connection.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            df = self._fetch_dataframe(cursor)
             cursor.close()
             
             print(f"✅ Query executed successfully. {len(df)} rows returned.")
@@ -142,7 +349,10 @@ class DatabricksJDBCManager:
             print(f"❌ Query failed: {e}")
             return None
             
-    def execute_statement(self, statement: str) -> bool:
+        finally:
+            self._pool.put(connection)
+            
+    def execute_statement(self, statement: str, params: Optional[List[Any]] = None) -> bool:
         """Execute SQL statement (CREATE, INSERT, UPDATE, DELETE)."""
         if not self._connection:
             if not self.connect():
@@ -150,9 +360,13 @@ class DatabricksJDBCManager:
                 
         try:
             cursor = self._connection.cursor()
-            cursor.execute(statement)
+            if params:
+                cursor.execute(statement, params)
+            else:
+                cursor.execute(statement)
             self._connection.commit()
             cursor.close()
+            self.schema_cache.invalidate_for_statement(statement)
             
             print("✅ Statement executed successfully")
             return True
@@ -161,6 +375,68 @@ class DatabricksJDBCManager:
             print(f"❌ Statement failed: {e}")
             return False
             
+    def insert_rows(self, table_name: str, columns: List[str], rows: List[tuple],
+                    expressions: Optional[Dict[str, str]] = None) -> bool:
+        """Insert rows using parameterized multi-row INSERT statements.
+        
+        Each statement carries as many rows as fit under the parameter cap,
+        so N rows cost ceil(N * len(columns) / 256) round-trips rather than N.
+        Columns named in expressions (e.g. {"created_at": "current_timestamp()"})
+        take that SQL expression in every row and are left out of rows, which
+        hold only the bound values. Large row sets without expressions are
+        handed to bulk_load() when a staging volume is set.
+        """
+        expressions = expressions or {}
+        bound_columns = [col for col in columns if col not in expressions]
+        if len(rows) > BULK_LOAD_THRESHOLD and self.staging_volume and not expressions:
+            return self.bulk_load(pd.DataFrame(rows, columns=columns), table_name)
+            
+        rows_per_statement = max(1, MAX_STATEMENT_PARAMETERS // max(1, len(bound_columns)))
+        row_placeholder = "(" + ", ".join(expressions.get(col, "?") for col in columns) + ")"
+        column_list = ", ".join(columns)
+        
+        for start in range(0, len(rows), rows_per_statement):
+            chunk = rows[start:start + rows_per_statement]
+            insert_sql = (
+                f"INSERT INTO {table_name} ({column_list}) VALUES "
+                + ", ".join([row_placeholder] * len(chunk))
+            )
+            params = [value for row in chunk for value in row]
+            if not self.execute_statement(insert_sql, params):
+                return False
+                
+        return True
+        
+    def bulk_load(self, df: pd.DataFrame, table_name: str) -> bool:
+        """Load a DataFrame with one COPY INTO from a Parquet file staged in a volume.
+        
+        Column names must match the target table; Parquet keeps the dtypes,
+        so the load is columnar and not bound by the parameter cap.
+        """
+        if not self.staging_volume:
+            print("❌ DATABRICKS_STAGING_VOLUME not set, cannot stage bulk load")
+            return False
+            
+        file_name = f"{table_name.replace('.', '_')}_{uuid.uuid4().hex}.parquet"
+        stage_uri = f"{self.staging_volume.rstrip('/')}/{file_name}"
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = os.path.join(tmp_dir, file_name)
+            df.to_parquet(local_path, engine="pyarrow", compression="zstd", index=False)
+            if not self.execute_statement(f"PUT '{local_path}' INTO '{stage_uri}' OVERWRITE"):
+                return False
+                
+        try:
+            loaded = self.execute_statement(
+                f"COPY INTO {table_name} FROM '{stage_uri}' FILEFORMAT = PARQUET"
+            )
+        finally:
+            self.execute_statement(f"REMOVE '{stage_uri}'")
+            
+        if loaded:
+            print(f"✅ Bulk loaded {len(df):,} rows into {table_name}")
+        return loaded
+            
     def create_sample_data(self, table_name: str = "di4marketing_sample") -> bool:
         """Create sample marketing data table."""
         
@@ -191,21 +467,26 @@ class DatabricksJDBCManager:
             return False
             
         # Insert sample data
-        insert_sql = f"""
-        INSERT INTO {table_name} VALUES
-        (1, 'CUST001', 'CAMP001', 'EMAIL', 10000, 250, 15, 1500.00, 100.00, current_timestamp(), 'North America', '25-34', 'Desktop'),
-        (2, 'CUST002', 'CAMP001', 'SOCIAL', 15000, 450, 28, 2800.00, 150.00, current_timestamp(), 'Europe', '35-44', 'Mobile'),
-        (3, 'CUST003', 'CAMP002', 'SEARCH', 8000, 320, 22, 2200.00, 200.00, current_timestamp(), 'Asia', '18-24', 'Tablet'),
-        (4, 'CUST004', 'CAMP002', 'DISPLAY', 12000, 180, 8, 800.00, 80.00, current_timestamp(), 'North America', '45-54', 'Desktop'),
-        (5, 'CUST005', 'CAMP003', 'EMAIL', 5000, 125, 12, 1200.00, 75.00, current_timestamp(), 'Europe', '25-34', 'Mobile'),
-        (6, 'CUST006', 'CAMP003', 'SOCIAL', 20000, 600, 45, 4500.00, 300.00, current_timestamp(), 'Asia', '35-44', 'Desktop'),
-        (7, 'CUST007', 'CAMP004', 'SEARCH', 7500, 300, 18, 1800.00, 175.00, current_timestamp(), 'North America', '18-24', 'Mobile'),
-        (8, 'CUST008', 'CAMP004', 'DISPLAY', 9500, 190, 11, 1100.00, 95.00, current_timestamp(), 'Europe', '45-54', 'Tablet'),
-        (9, 'CUST009', 'CAMP005', 'EMAIL', 6000, 150, 20, 2000.00, 90.00, current_timestamp(), 'Asia', '25-34', 'Desktop'),
-        (10, 'CUST010', 'CAMP005', 'SOCIAL', 18000, 540, 35, 3500.00, 270.00, current_timestamp(), 'North America', '35-44', 'Mobile')
-        """
+        columns = [
+            "id", "customer_id", "campaign_id", "channel", "impressions", "clicks",
+            "conversions", "revenue", "cost", "date_created", "region", "age_group",
+            "device_type"
+        ]
+        rows = [
+            (1, 'CUST001', 'CAMP001', 'EMAIL', 10000, 250, 15, 1500.00, 100.00, 'North America', '25-34', 'Desktop'),
+            (2, 'CUST002', 'CAMP001', 'SOCIAL', 15000, 450, 28, 2800.00, 150.00, 'Europe', '35-44', 'Mobile'),
+            (3, 'CUST003', 'CAMP002', 'SEARCH', 8000, 320, 22, 2200.00, 200.00, 'Asia', '18-24', 'Tablet'),
+            (4, 'CUST004', 'CAMP002', 'DISPLAY', 12000, 180, 8, 800.00, 80.00, 'North America', '45-54', 'Desktop'),
+            (5, 'CUST005', 'CAMP003', 'EMAIL', 5000, 125, 12, 1200.00, 75.00, 'Europe', '25-34', 'Mobile'),
+            (6, 'CUST006', 'CAMP003', 'SOCIAL', 20000, 600, 45, 4500.00, 300.00, 'Asia', '35-44', 'Desktop'),
+            (7, 'CUST007', 'CAMP004', 'SEARCH', 7500, 300, 18, 1800.00, 175.00, 'North America', '18-24', 'Mobile'),
+            (8, 'CUST008', 'CAMP004', 'DISPLAY', 9500, 190, 11, 1100.00, 95.00, 'Europe', '45-54', 'Tablet'),
+            (9, 'CUST009', 'CAMP005', 'EMAIL', 6000, 150, 20, 2000.00, 90.00, 'Asia', '25-34', 'Desktop'),
+            (10, 'CUST010', 'CAMP005', 'SOCIAL', 18000, 540, 35, 3500.00, 270.00, 'North America', '35-44', 'Mobile')
+        ]
         
-        if self.execute_statement(insert_sql):
+        # date_created is stamped by the warehouse, not bound from the client clock
+        if self.insert_rows(table_name, columns, rows, {"date_created": "current_timestamp()"}):
             print(f"✅ Sample data created in table: {table_name}")
             return True
         else:
@@ -214,61 +495,22 @@ class DatabricksJDBCManager:
     def get_table_info(self, table_name: str) -> Optional[pd.DataFrame]:
         """Get information about a table."""
         query = f"DESCRIBE {table_name}"
-        return self.execute_query(query)
+        return self.schema_cache.get(table_name, lambda: self.execute_query(query))
         
     def analyze_marketing_data(self, table_name: str = "di4marketing_sample") -> Dict[str, pd.DataFrame]:
-        """Perform marketing data analysis."""
-        analyses = {}
-        
-        # Channel performance
-        channel_query = f"""
-        SELECT 
-            channel,
-            SUM(impressions) as total_impressions,
-            SUM(clicks) as total_clicks,
-            SUM(conversions) as total_conversions,
-            SUM(revenue) as total_revenue,
-            SUM(cost) as total_cost,
-            ROUND(SUM(clicks) / SUM(impressions) * 100, 2) as ctr_percent,
-            ROUND(SUM(conversions) / SUM(clicks) * 100, 2) as conversion_rate,
-            ROUND(SUM(revenue) / SUM(cost), 2) as roas
-        FROM {table_name}
-        GROUP BY channel
-        ORDER BY total_revenue DESC
-        """
-        analyses['channel_performance'] = self.execute_query(channel_query)
+        """Perform marketing data analysis.
         
-        # Regional analysis
-        region_query = f"""
-        SELECT 
-            region,
-            COUNT(*) as campaigns,
-            SUM(revenue) as total_revenue,
-            AVG(conversion_rate) as avg_conversion_rate
-        FROM (
-            SELECT 
-                region,
-                conversions / clicks * 100 as conversion_rate,
-                revenue
-            FROM {table_name}
-        ) t
-        GROUP BY region
-        ORDER BY total_revenue DESC
+        Every ratio (CTR, conversion rate, ROAS) is computed in the SQL, so the
+        returned DataFrames are presentation-ready and need no pandas aggregation.
         """
-        analyses['regional_performance'] = self.execute_query(region_query)
-        
-        # Age group insights
-        age_query = f"""
-        SELECT 
-            age_group,
-            SUM(revenue) as total_revenue,
-            AVG(cost) as avg_cost,
-            COUNT(*) as campaign_count
-        FROM {table_name}
-        GROUP BY age_group
-        ORDER BY total_revenue DESC
-        """
-        analyses['age_group_insights'] = self.execute_query(age_query)
+        # The three analyses are independent; run them concurrently on pooled connections
+        queries = {
+            name: _query(name, table_name)
+            for name in ['channel_performance', 'regional_performance', 'age_group_insights']
+        }
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            results = executor.map(self.execute_query_pooled, queries.values())
+            analyses = dict(zip(queries.keys(), results))
         
         return analyses
 
@@ -291,7 +533,11 @@ def main():
             
             # Query sample data
             print("📊 Querying sample data...")
-            sample_data = jdbc_manager.execute_query("SELECT * FROM di4marketing_sample LIMIT 5")
+            sample_data = jdbc_manager.execute_query(
+                "SELECT id, customer_id, campaign_id, channel, impressions, clicks, conversions, revenue, "
+                "cost, date_created, region, age_group, device_type "
+                "FROM di4marketing_sample LIMIT 5"
+            )
             if sample_data is not None:
                 print(sample_data.to_string())
                 
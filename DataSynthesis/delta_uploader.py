@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Delta Table Uploader
+Shared upload path for the generators: fill a fresh staging table with one
+COPY INTO from a staged Parquet file, or with concurrent INSERT batches, then
+swap its rows into the target Delta table in one commit.
+"""
+
+import os
+import uuid
+import queue
+import tempfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+from databricks import sql
+
+
+class DeltaUploader(ABC):
+    """Upload generated datasets to a Delta table in Databricks.
+
+    Subclasses provide the table DDL (_create_sql) and the Arrow table staged
+    for COPY INTO (_staging_table); label names the data in progress messages.
+    """
+
+    schema_name = "apscat.di4marketing"
+
+    def __init__(self, http_path, label, batch_size=5000):
+        load_dotenv()
+        self.server_hostname = "e2-demo-field-eng.cloud.databricks.com"
+        self.http_path = http_path
+        self.access_token = os.getenv("TOKEN")
+        self.label = label
+        # Optional Unity Catalog volume; when set, uploads go through COPY INTO
+        self.staging_volume = os.getenv("DATABRICKS_STAGING_VOLUME")
+        # INSERT fallback: rows per statement and concurrent connections
+        self.batch_size = batch_size
+        self.upload_workers = 8
+        # Connections are opened on first use and reused by later uploads until close()
+        self._connection = None
+        self._insert_connections = queue.Queue()
+        self._insert_connection_count = 0
+
+    @abstractmethod
+    def _create_sql(self, full_table_name):
+        """Return the CREATE OR REPLACE TABLE statement for a table in the target's schema.
+
+        Each upload runs it for a fresh staging table, whose columns the
+        target then takes on.
+        """
+
+    @abstractmethod
+    def _staging_table(self, df):
+        """Return the DataFrame as an Arrow table in the target table's types."""
+
+    def _connect(self):
+        """Open a warehouse connection."""
+        return sql.connect(
+            server_hostname=self.server_hostname,
+            http_path=self.http_path,
+            access_token=self.access_token,
+            # PUT may only read local files from this path
+            staging_allowed_local_path=tempfile.gettempdir() if self.staging_volume else None
+        )
+
+    def _get_connection(self):
+        """Return the cached warehouse connection, opening it on first use."""
+        if self._connection is None:
+            print("🔌 Connecting to Databricks...")
+            self._connection = self._connect()
+        return self._connection
+
+    def close(self):
+        """Close every cached connection; the next upload reconnects.
+
+        The cache is emptied before anything is closed, and a connection that
+        fails to close is reported and skipped, so the rest are still closed.
+        """
+        connections = [] if self._connection is None else [self._connection]
+        while not self._insert_connections.empty():
+            connections.append(self._insert_connections.get_nowait())
+        self._connection = None
+        self._insert_connection_count = 0
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception as e:
+                print(f"⚠️  Failed to close a Databricks connection: {e}")
+
+    def _bulk_load(self, cursor, df, full_table_name):
+        """Stage the DataFrame as Parquet in the volume and load it with one COPY INTO."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = os.path.join(tmp_dir, f"{full_table_name.replace('.', '_')}.parquet")
+            pq.write_table(self._staging_table(df), local_path, compression="zstd")
+            return self._copy_parquet(cursor, local_path, full_table_name)
+
+    def _copy_parquet(self, cursor, local_path, full_table_name):
+        """PUT a local Parquet file into the staging volume and load it with one COPY INTO.
+
+        Returns the number of rows loaded, read from the file's footer.
+        """
+        file_name = f"{full_table_name.replace('.', '_')}_{uuid.uuid4().hex}.parquet"
+        stage_uri = f"{self.staging_volume.rstrip('/')}/{file_name}"
+        num_rows = pq.ParquetFile(local_path).metadata.num_rows
+        print(f"📤 Staging {num_rows:,} {self.label} records to {stage_uri}...")
+        cursor.execute(f"PUT '{local_path}' INTO '{stage_uri}' OVERWRITE")
+        try:
+            # The staged name is unique, so skip COPY INTO's check for already-loaded files
+            cursor.execute(
+                f"COPY INTO {full_table_name} FROM '{stage_uri}' FILEFORMAT = PARQUET "
+                "COPY_OPTIONS ('force' = 'true')"
+            )
+        finally:
+            cursor.execute(f"REMOVE '{stage_uri}'")
+        print("   ✅ COPY INTO complete")
+        return num_rows
+
+    def _sql_literals(self, values):
+        """Format a column as an Arrow string array of SQL literals, with NULL for missing values."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Format each category once and pick by code; code -1 (missing) picks the trailing NULL
+            categories = self._sql_literals(pd.Series(values.cat.categories))
+            codes = values.cat.codes.to_numpy()
+            return pa.concat_arrays([categories, pa.array(['NULL'])]).take(np.where(codes < 0, len(categories), codes))
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            array = pa.array(values.to_numpy().astype('datetime64[s]'))
+            formatted = pc.binary_join_element_wise("'", pc.strftime(array, '%Y-%m-%d %H:%M:%S'), "'", '')
+        else:
+            array = pa.array(values, from_pandas=True)
+            if pa.types.is_boolean(array.type):
+                formatted = pc.if_else(array, 'true', 'false')
+            elif pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+                formatted = pc.cast(array, pa.string())
+            else:
+                # Spark SQL string literals take backslash escapes; a doubled quote is not one
+                escaped = pc.replace_substring(pc.cast(array, pa.string()), '\\', '\\\\')
+                escaped = pc.replace_substring(escaped, "'", "\\'")
+                formatted = pc.binary_join_element_wise("'", escaped, "'", '')
+        # Missing values stay null through every kernel above
+        return pc.fill_null(formatted, 'NULL')
+
+    def _sql_literal_rows(self, df):
+        """Render every row of the DataFrame as a SQL VALUES tuple.
+
+        Each column is formatted once as an Arrow array of literals (see
+        _sql_literals) and the columns are joined row-wise by Arrow's C++
+        kernels, so no Python string is built per cell or per row.
+        """
+        columns = [self._sql_literals(df[col]) for col in df.columns]
+        rows = pc.binary_join_element_wise('(', pc.binary_join_element_wise(*columns, ', '), ')', '')
+        # Arrow-backed columns of a concatenated frame come back chunked
+        return rows.combine_chunks() if isinstance(rows, pa.ChunkedArray) else rows
+
+    def _join_rows(self, rows):
+        """Join a batch of rendered rows into one VALUES list."""
+        offsets = pa.array([0, len(rows)], pa.int32())
+        return pc.binary_join(pa.ListArray.from_arrays(offsets, rows), ', ')[0].as_py()
+
+    def _insert_batches(self, df, full_table_name):
+        """Insert the DataFrame as literal multi-row INSERT statements and return the row count.
+
+        Batches are independent, so they are sent concurrently over a small
+        pool of connections (cursors are not shared between threads). The
+        pool is kept for later calls, so each connection is opened only once.
+        Each batch renders its own slice of rows, so only the batches in
+        flight are held as SQL text.
+        """
+        batch_starts = range(0, len(df), self.batch_size)
+        total_batches = len(batch_starts)
+        if total_batches == 0:
+            return 0
+        workers = min(self.upload_workers, total_batches)
+        connections = self._insert_connections
+        while self._insert_connection_count < workers:
+            connections.put(self._connect())
+            self._insert_connection_count += 1
+
+        def insert_batch(i, batch_start):
+            rows = self._sql_literal_rows(df.iloc[batch_start:batch_start + self.batch_size])
+            insert_sql = f"INSERT INTO {full_table_name} VALUES " + self._join_rows(rows)
+            connection = connections.get()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(insert_sql)
+            finally:
+                connections.put(connection)
+            print(f"   ✅ Batch {i+1}/{total_batches}")
+
+        print(f"📤 Uploading {len(df):,} {self.label} records in {total_batches} batches over {workers} connections...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() re-raises the first failed batch
+            list(executor.map(insert_batch, range(total_batches), batch_starts))
+        return len(df)
+
+    def upload_dataframe(self, df, table_name):
+        """Replace the table's rows with the DataFrame, creating the table if needed."""
+        def load(cursor, full_table_name):
+            if self.staging_volume:
+                return self._bulk_load(cursor, df, full_table_name)
+            return self._insert_batches(df, full_table_name)
+        return self._upload(table_name, load)
+
+    def upload_parquet(self, path, table_name):
+        """Replace the table's rows with a Parquet file written in its types, creating the table if needed.
+
+        The file is never read whole: it is COPY'd in as is through the staging
+        volume, or otherwise inserted a few batches' worth of rows at a time.
+        """
+        def load(cursor, full_table_name):
+            if self.staging_volume:
+                return self._copy_parquet(cursor, path, full_table_name)
+            parquet_file = pq.ParquetFile(path)
+            return sum(
+                self._insert_batches(batch.to_pandas(), full_table_name)
+                for batch in parquet_file.iter_batches(batch_size=self.batch_size * self.upload_workers)
+            )
+        return self._upload(table_name, load)
+
+    def _column_types(self, cursor, full_table_name):
+        """Return the table's (column, type) pairs in order, or None if it does not exist."""
+        schema_name, table_name = full_table_name.rsplit('.', 1)
+        cursor.execute(f"SHOW TABLES IN {schema_name} LIKE '{table_name}'")
+        if not cursor.fetchall():
+            return None
+        cursor.execute(f"DESCRIBE TABLE {full_table_name}")
+        columns = []
+        for col_name, data_type, *_ in cursor.fetchall():
+            # Partitioning and other sections follow a blank or '#' row
+            if not col_name or col_name.startswith('#'):
+                break
+            columns.append((col_name.lower(), data_type.lower()))
+        return columns
+
+    def _upload(self, table_name, load):
+        """Fill a staging table with load(cursor, staging_table_name), then swap it into the table.
+
+        The target is overwritten from the staging table in a single INSERT
+        OVERWRITE commit, so readers see the old rows until the new ones are
+        complete, a failed load leaves the target untouched, and the target
+        keeps its catalog entry and Delta history. A target that is missing
+        or whose column types differ from the staging table's (an older DDL)
+        is instead created or replaced from it with CREATE OR REPLACE TABLE
+        AS SELECT. load returns the number of rows it sent, which is known
+        locally, so no COUNT(*) scan is needed.
+        """
+        if not self.access_token:
+            print("❌ TOKEN not found")
+            return False
+        label = self.label[0].upper() + self.label[1:]
+        full_table_name = f"{self.schema_name}.{table_name}"
+        # Unique per upload, so concurrent uploads to one table never share it
+        staging_table_name = f"{full_table_name}__staging_{uuid.uuid4().hex[:8]}"
+        try:
+            with self._get_connection().cursor() as cursor:
+                print(f"🏗️  Staging {self.label} data in {staging_table_name}...")
+                cursor.execute(self._create_sql(staging_table_name))
+                try:
+                    count = load(cursor, staging_table_name)
+                    print(f"🔁 Swapping {count:,} {self.label} records into {full_table_name}...")
+                    target_columns = self._column_types(cursor, full_table_name)
+                    if target_columns == self._column_types(cursor, staging_table_name):
+                        cursor.execute(f"INSERT OVERWRITE {full_table_name} SELECT * FROM {staging_table_name}")
+                    else:
+                        # Missing, or created under an older DDL: recreate it in the
+                        # current types, still as one atomic commit
+                        if target_columns is not None:
+                            print(f"🔧 {full_table_name} has outdated column types; recreating it")
+                        cursor.execute(f"CREATE OR REPLACE TABLE {full_table_name} AS SELECT * FROM {staging_table_name}")
+                finally:
+                    cursor.execute(f"DROP TABLE IF EXISTS {staging_table_name}")
+            print(f"🎉 {label} upload complete! {count:,} records in {full_table_name}")
+            return True
+        except Exception as e:
+            print(f"❌ {label} upload failed: {e}")
+            # A failed connection must not be reused by the next upload
+            self.close()
+            return False
@@ -6,23 +6,28 @@ Generates comprehensive anonymous customer data with advanced tracking columns.
 
 import pandas as pd
 import numpy as np
-import random
-import uuid
-import json
-from datetime import datetime, timedelta
-from faker import Faker
-import os
-from dotenv import load_dotenv
-from databricks import sql
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-fake = Faker(['en_AU', 'ja_JP', 'ko_KR', 'zh_CN', 'en_IN'])
+from delta_uploader import DeltaUploader
+from generator_utils import to_table_types, padded_table, hex_ids, ip_addresses, event_sequences
+
+def table_schema(df):
+    """Arrow schema for df with the all-NULL identity columns typed as strings, not null."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    return pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema])
 
 class EnhancedAnonymousGenerator:
     """Generates enhanced anonymous customer data with realistic patterns."""
     
-    def __init__(self, num_records=10000):
+    def __init__(self, num_records=10000, seed=None):
         self.num_records = num_records
         
+        # One PCG64 generator for every draw; pass a seed for reproducible data
+        self.rng = np.random.default_rng(seed)
+        
         # APJ-focused countries
         self.apj_countries = {
             'Australia': {'weight': 15, 'cities': ['Sydney', 'Melbourne', 'Brisbane', 'Perth'], 'states': ['NSW', 'VIC', 'QLD', 'WA'], 'timezone': 'AEDT'},
@@ -37,414 +42,442 @@ class EnhancedAnonymousGenerator:
         
         # Device and browser data
         self.devices = {
-            'mobile': {'browsers': ['Chrome Mobile', 'Safari Mobile', 'Samsung Internet', 'Firefox Mobile'], 'os': ['Android', 'iOS']},
-            'desktop': {'browsers': ['Chrome', 'Safari', 'Firefox', 'Edge'], 'os': ['Windows', 'macOS', 'Linux']},
-            'tablet': {'browsers': ['Chrome Mobile', 'Safari Mobile'], 'os': ['Android', 'iOS']}
+            'mobile': {'browsers': ['Chrome Mobile', 'Safari Mobile', 'Samsung Internet', 'Firefox Mobile'], 'os': ['Android', 'iOS'],
+                       'screen_resolutions': ['375x667', '414x896', '360x640', '393x851', '428x926']},
+            'desktop': {'browsers': ['Chrome', 'Safari', 'Firefox', 'Edge'], 'os': ['Windows', 'macOS', 'Linux'],
+                        'screen_resolutions': ['1920x1080', '1366x768', '1536x864', '2560x1440', '1440x900']},
+            'tablet': {'browsers': ['Chrome Mobile', 'Safari Mobile'], 'os': ['Android', 'iOS'],
+                       'screen_resolutions': ['768x1024', '1024x768', '820x1180', '810x1080']}
         }
+        self.desktop_viewports = ['1200x800', '1366x768', '1536x864', '1920x1080']
         
         # Traffic sources
         self.utm_sources = ['google', 'facebook', 'instagram', 'linkedin', 'twitter', 'tiktok', 'youtube', 'bing', 'direct', 'organic']
         self.utm_mediums = ['cpc', 'organic', 'social', 'email', 'referral', 'direct', 'display', 'video']
+        self.utm_campaigns = ['summer_sale', 'new_product_launch', 'retargeting', 'brand_awareness', 'holiday_promo']
+        
+        # Pages; sessions always start on the homepage
+        self.page_types = ['homepage', 'product', 'category', 'search', 'cart', 'checkout', 'account', 'help', 'about']
+        self.entry_pages = ['homepage']
+        self.landing_pages = ['product', 'category', 'search']  # When not landing on the homepage
+        self.days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        
+        # IP address ranges by country
+        self.ip_ranges = {
+            'Australia': ['1.0.0', '14.0.0'],
+            'Japan': ['126.0.0', '133.0.0'],
+            'South Korea': ['1.201.0', '14.32.0'],
+            'China': ['1.2.0', '14.144.0'],
+            'India': ['1.23.0', '14.96.0'],
+            'Singapore': ['8.20.0', '103.10.0'],
+            'Thailand': ['1.46.0', '14.207.0'],
+            'Malaysia': ['1.9.0', '14.102.0']
+        }
         
         # Engagement segments
         self.segments = ['new-visitor', 'returning', 'high-engagement', 'low-engagement', 'at-risk', 'loyal']
         
-    def _generate_geo_data(self):
-        """Generate geographic data with timezone."""
-        countries = list(self.apj_countries.keys())
-        weights = [self.apj_countries[c]['weight'] for c in countries]
-        
-        country = np.random.choice(countries, p=np.array(weights)/sum(weights))
-        country_data = self.apj_countries[country]
-        
-        city = random.choice(country_data['cities'])
-        state = random.choice(country_data['states'])
-        timezone = country_data['timezone']
-        
-        return country, state, city, timezone
-        
-    def _generate_device_data(self):
-        """Generate realistic device, browser, and OS data."""
-        device_type = np.random.choice(['mobile', 'desktop', 'tablet'], p=[0.65, 0.25, 0.10])
-        device_info = self.devices[device_type]
-        
-        browser = random.choice(device_info['browsers'])
-        os = random.choice(device_info['os'])
-        
-        # Generate realistic specs
-        if device_type == 'mobile':
-            screen_resolution = random.choice(['375x667', '414x896', '360x640', '393x851', '428x926'])
-            viewport_size = screen_resolution
-        elif device_type == 'desktop':
-            screen_resolution = random.choice(['1920x1080', '1366x768', '1536x864', '2560x1440', '1440x900'])
-            viewport_size = random.choice(['1200x800', '1366x768', '1536x864', '1920x1080'])
-        else:  # tablet
-            screen_resolution = random.choice(['768x1024', '1024x768', '820x1180', '810x1080'])
-            viewport_size = screen_resolution
-            
+        # Low-cardinality string columns, stored as pandas categoricals
+        self.categorical_columns = [
+            'geo_country', 'geo_state', 'geo_city', 'device_type', 'segment', 'browser_name', 'operating_system',
+            'screen_resolution', 'viewport_size', 'timezone', 'utm_source', 'utm_medium', 'utm_campaign',
+            'landing_page', 'referrer_domain', 'day_of_week'
+        ]
+        
+        # Country lookup tables, indexed by country position; city/state rows
+        # are padded with '' past each country's own count
+        self._country_names = np.array(list(self.apj_countries), dtype=object)
+        weights = np.array([self.apj_countries[c]['weight'] for c in self._country_names], dtype=np.float64)
+        self._country_p = weights / weights.sum()
+        self._timezones = np.array([self.apj_countries[c]['timezone'] for c in self._country_names], dtype=object)
+        self._city_counts = np.array([len(self.apj_countries[c]['cities']) for c in self._country_names])
+        self._state_counts = np.array([len(self.apj_countries[c]['states']) for c in self._country_names])
+        self._city_table = padded_table([self.apj_countries[c]['cities'] for c in self._country_names])
+        self._state_table = padded_table([self.apj_countries[c]['states'] for c in self._country_names])
+        self._ip_counts = np.array([len(self.ip_ranges.get(c, ['192.168.0'])) for c in self._country_names])
+        self._ip_table = padded_table([self.ip_ranges.get(c, ['192.168.0']) for c in self._country_names])
+        
+        # Device lookup tables, indexed by device position
+        self._device_names = np.array(list(self.devices), dtype=object)
+        self._device_p = [0.65, 0.25, 0.10]  # mobile, desktop, tablet
+        self._device_options = [
+            {field: np.array(self.devices[d][field], dtype=object) for field in ('browsers', 'os', 'screen_resolutions')}
+            for d in self._device_names
+        ]
+        
+    def _vec_geo_data(self, n):
+        """Generate geographic data with timezone for n records.
+        
+        The country index is returned first for indexing other per-country tables.
+        """
+        country_idx = self.rng.choice(len(self._country_names), size=n, p=self._country_p)
+        country = self._country_names[country_idx]
+        city = self._city_table[country_idx, self.rng.integers(0, self._city_counts[country_idx])]
+        state = self._state_table[country_idx, self.rng.integers(0, self._state_counts[country_idx])]
+        timezone = self._timezones[country_idx]
+        
+        return country_idx, country, state, city, timezone
+        
+    def _vec_device_data(self, n):
+        """Generate realistic device, browser, and OS data for n records."""
+        device_idx = self.rng.choice(len(self._device_names), size=n, p=self._device_p)
+        device_type = self._device_names[device_idx]
+        browser = np.empty(n, dtype=object)
+        os = np.empty(n, dtype=object)
+        screen_resolution = np.empty(n, dtype=object)
+        # One batched pick per field for all records of each device type
+        for i, options in enumerate(self._device_options):
+            mask = device_idx == i
+            count = int(mask.sum())
+            browser[mask] = options['browsers'][self.rng.integers(0, len(options['browsers']), count)]
+            os[mask] = options['os'][self.rng.integers(0, len(options['os']), count)]
+            # Generate realistic specs
+            screen_resolution[mask] = options['screen_resolutions'][self.rng.integers(0, len(options['screen_resolutions']), count)]
+        
+        # Mobile and tablet viewports match the screen; desktop windows vary
+        viewport_size = np.where(
+            device_type == 'desktop',
+            self.rng.choice(self.desktop_viewports, size=n).astype(object),
+            screen_resolution
+        )
         return device_type, browser, os, screen_resolution, viewport_size
         
-    def _generate_session_data(self):
-        """Generate realistic session behavior data."""
+    def _vec_session_data(self, n):
+        """Generate realistic session behavior data for n records."""
         # Session duration (seconds) - realistic patterns
-        if random.random() < 0.3:  # 30% bounce
-            duration = random.randint(5, 30)
-            page_views = 1
-            is_bounce = True
-        else:
-            duration = np.random.gamma(2, 120)  # Average ~4 minutes
-            duration = max(30, min(duration, 3600))  # 30sec to 1hr
-            page_views = max(2, int(np.random.poisson(3.5)))
-            is_bounce = False
-            
+        is_bounce = self.rng.random(n) < 0.3  # 30% bounce
+        duration = np.clip(self.rng.gamma(2, 120, n), 30, 3600)  # Average ~4 minutes, 30sec to 1hr
+        duration[is_bounce] = self.rng.integers(5, 31, int(is_bounce.sum()))
+        page_views = np.maximum(2, self.rng.poisson(3.5, n))
+        page_views[is_bounce] = 1
+        
         # Calculate derived metrics
-        avg_time_per_page = duration / page_views if page_views > 0 else duration
-        scroll_depth = random.randint(25, 100) if not is_bounce else random.randint(10, 40)
-        click_count = random.randint(0, 2) if is_bounce else random.randint(2, 15)
+        avg_time_per_page = duration / page_views
+        scroll_depth = np.where(is_bounce, self.rng.integers(10, 41, n), self.rng.integers(25, 101, n))
+        click_count = np.where(is_bounce, self.rng.integers(0, 3, n), self.rng.integers(2, 16, n))
         
         return duration, page_views, is_bounce, avg_time_per_page, scroll_depth, click_count
         
-    def _generate_utm_data(self):
-        """Generate marketing attribution data."""
+    def _vec_utm_data(self, n):
+        """Generate marketing attribution data for n records."""
         # 40% organic/direct traffic, 60% paid/referred
-        if random.random() < 0.4:
-            utm_source = random.choice(['direct', 'organic'])
-            utm_medium = 'organic' if utm_source == 'organic' else 'direct'
-            utm_campaign = None
-        else:
-            utm_source = random.choice(self.utm_sources)
-            utm_medium = random.choice(self.utm_mediums)
-            campaigns = ['summer_sale', 'new_product_launch', 'retargeting', 'brand_awareness', 'holiday_promo']
-            utm_campaign = random.choice(campaigns)
-            
+        is_direct = self.rng.random(n) < 0.4
+        direct_source = self.rng.choice(['direct', 'organic'], size=n).astype(object)
+        utm_source = np.where(is_direct, direct_source, self.rng.choice(self.utm_sources, size=n).astype(object))
+        utm_medium = np.where(
+            is_direct,
+            np.where(direct_source == 'organic', 'organic', 'direct'),
+            self.rng.choice(self.utm_mediums, size=n)
+        ).astype(object)
+        utm_campaign = np.where(is_direct, None, self.rng.choice(self.utm_campaigns, size=n).astype(object))
+        
         return utm_source, utm_medium, utm_campaign
         
-    def _generate_engagement_scores(self):
-        """Generate realistic engagement and propensity scores."""
+    def _vec_engagement_scores(self, n):
+        """Generate realistic engagement and propensity scores for n records."""
         # Engagement score (0-100)
-        engagement_score = max(0, min(100, int(np.random.normal(45, 20))))
+        engagement_score = np.clip(self.rng.normal(45, 20, n).astype(np.int64), 0, 100)
         
         # Churn score (0-1, higher = more likely to churn)
-        churn_score = np.random.beta(2, 5)  # Skewed towards lower churn
+        churn_score = self.rng.beta(2, 5, n)  # Skewed towards lower churn
         
         # Propensity to convert (0-1)
-        conversion_propensity = np.random.beta(3, 7)  # Most users low propensity
-        
-        return engagement_score, round(churn_score, 3), round(conversion_propensity, 3)
-        
-    def _generate_event_sequence(self, page_views, click_count):
-        """Generate realistic event sequence data."""
-        events = []
-        
-        # Common page types
-        page_types = ['homepage', 'product', 'category', 'search', 'cart', 'checkout', 'account', 'help', 'about']
-        for i in range(page_views):
-            if i == 0:
-                page = 'homepage'
-            else:
-                page = random.choice(page_types)
-                
-            event = {
-                'page': page,
-                'timestamp': fake.date_time_between(start_date='-1h', end_date='now').isoformat(),
-                'duration_seconds': random.randint(10, 300)
-            }
-            events.append(event)
-            
-        return json.dumps(events)
+        conversion_propensity = self.rng.beta(3, 7, n)  # Most users low propensity
+        
+        return engagement_score, np.round(churn_score, 3), np.round(conversion_propensity, 3)
         
-    def generate_enhanced_dataset(self):
-        """Generate the complete enhanced anonymous dataset."""
+    def _vec_segment(self, is_bounce, engagement_score, churn_score, event_count):
+        """Assign each record the first matching segment, in priority order."""
+        conditions = [
+            is_bounce & (engagement_score < 30),
+            engagement_score > 70,
+            churn_score > 0.7,
+            event_count > 10,
+            engagement_score > 50,
+            event_count < 3,
+            (churn_score < 0.3) & (engagement_score > 40)
+        ]
+        choices = ['low-engagement', 'high-engagement', 'at-risk', 'loyal',
+                   'medium-engagement', 'new-visitor', 're-engaged']
+        return np.select(conditions, choices, default='returning').astype(object)
+        
+    def generate_enhanced_dataset(self, chunk_size=100000):
+        """Generate the complete enhanced anonymous dataset.
+        
+        Records are generated in chunks of up to chunk_size and concatenated.
+        """
         print(f"🏗️  Generating {self.num_records} enhanced anonymous records...")
         
-        data = []
+        # Categorize after concat; chunks with differing categories would concat to object
+        df = pd.concat(
+            [self._generate_chunk(size) for size in self._chunk_sizes(chunk_size)],
+            ignore_index=True
+        )
+        df = df.astype({col: 'category' for col in self.categorical_columns})
         
-        for i in range(self.num_records):
-            # Basic geo and device data
-            country, state, city, timezone = self._generate_geo_data()
-            device_type, browser, os, screen_res, viewport = self._generate_device_data()
-            
-            # Session behavior
-            duration, page_views, is_bounce, avg_time_per_page, scroll_depth, click_count = self._generate_session_data()
-            
-            # Marketing attribution
-            utm_source, utm_medium, utm_campaign = self._generate_utm_data()
-            
-            # Engagement metrics
-            engagement_score, churn_score, conversion_propensity = self._generate_engagement_scores()
+        print("✅ Enhanced dataset generation complete!")
+        self._print_enhanced_summary(df)
+        
+        return df
+        
+    def write_parquet(self, path, chunk_size=100000):
+        """Stream the dataset to a Parquet file, one row group per chunk.
+        
+        Each chunk is written as soon as it is generated and then dropped, so
+        peak memory stays flat however large num_records is. Columns are
+        written in the table's types (see to_table_types). The write runs
+        on a background thread while the next chunk is generated; at most one
+        chunk waits to be written. Returns the number of records written.
+        """
+        print(f"🏗️  Streaming {self.num_records} enhanced anonymous records to {path}...")
+        
+        writer = None
+        written = 0
+        
+        def write(table):
+            nonlocal written
+            writer.write_table(table)
+            written += table.num_rows
+            # Report each 10% crossed, not every chunk, so large runs stay readable
+            if written * 10 // self.num_records > (written - table.num_rows) * 10 // self.num_records:
+                print(f"   ✅ {written:,}/{self.num_records:,} records written")
+        
+        try:
+            with ThreadPoolExecutor(max_workers=1) as write_executor:
+                pending = None
+                for size in self._chunk_sizes(chunk_size):
+                    # Categoricals are stored as Arrow dictionaries and load back as categoricals
+                    chunk = to_table_types(self._generate_chunk(size)).astype(
+                        {col: 'category' for col in self.categorical_columns}
+                    )
+                    if writer is None:
+                        # Later chunks are cast to the first chunk's schema
+                        schema = table_schema(chunk)
+                        writer = pq.ParquetWriter(path, schema, compression="zstd")
+                    table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                    if pending is not None:
+                        pending.result()
+                    # Parquet encoding and compression release the GIL
+                    pending = write_executor.submit(write, table)
+                if pending is not None:
+                    pending.result()
+        finally:
+            if writer is not None:
+                writer.close()
+        
+        print("✅ Enhanced dataset streamed!")
+        return written
+        
+    def _chunk_sizes(self, chunk_size):
+        """Split num_records into chunks of at most chunk_size."""
+        return [min(chunk_size, self.num_records - start) for start in range(0, self.num_records, chunk_size)]
+        
+    def _generate_chunk(self, n):
+        """Generate n records.
+        
+        Each column is drawn for all records at once as a NumPy array; the
+        DataFrame is assembled from the columns at the end.
+        """
+        # Basic geo and device data
+        country_idx, country, state, city, timezone = self._vec_geo_data(n)
+        device_type, browser, os, screen_res, viewport = self._vec_device_data(n)
+        
+        # Session behavior
+        duration, page_views, is_bounce, avg_time_per_page, scroll_depth, click_count = self._vec_session_data(n)
+        
+        # Marketing attribution
+        utm_source, utm_medium, utm_campaign = self._vec_utm_data(n)
+        
+        # Engagement metrics
+        engagement_score, churn_score, conversion_propensity = self._vec_engagement_scores(n)
+        
+        # Event data
+        event_count = np.maximum(1, page_views + self.rng.integers(0, 6, n))
+        # Last activity within the last 60 days
+        last_event = np.datetime64(datetime.now(), 's') - self.rng.integers(0, 60 * 86400, n).astype('timedelta64[s]')
+        event_sequence = event_sequences(self.rng, page_views, self.page_types, self.entry_pages, (10, 300))
+        
+        # IP address
+        ip_address = ip_addresses(self.rng, self._ip_table, self._ip_counts, country_idx)
+        
+        # Visit day; is_weekend is derived from it rather than drawn separately
+        day_of_week = self.rng.choice(self.days_of_week, size=n).astype(object)
+        
+        # Segment assignment based on behavior
+        segment = self._vec_segment(is_bounce, engagement_score, churn_score, event_count)
+        
+        df = pd.DataFrame({
+            # Original columns
+            'customer_id': None,
+            'known_flag': False,
+            'anon_id': hex_ids(self.rng, 'ANON_', n, 12),
+            'email': None,
+            'phone_number': None,
+            'geo_country': country,
+            'geo_state': state,
+            'geo_city': city,
+            'ip_address': ip_address,
+            'device_type': device_type,
+            'event_count': event_count,
+            'last_event_date': last_event,
+            'segment': segment,
             
-            # Event data
-            event_count = max(1, page_views + random.randint(0, 5))
-            last_event = fake.date_time_between(start_date='-60d', end_date='now')
-            event_sequence = self._generate_event_sequence(page_views, click_count)
+            # Enhanced columns for anonymous tracking
+            'session_id': hex_ids(self.rng, 'SESS_', n, 16),
+            'session_duration_seconds': duration.astype(np.int64),
+            'page_views': page_views,
+            'is_bounce_session': is_bounce,
+            'avg_time_per_page_seconds': np.round(avg_time_per_page, 1),
+            'scroll_depth_percent': scroll_depth,
+            'click_count': click_count,
             
-            # IP address
-            ip_ranges = {
-                'Australia': ['1.0.0', '14.0.0'],
-                'Japan': ['126.0.0', '133.0.0'],
-                'South Korea': ['1.201.0', '14.32.0'],
-                'China': ['1.2.0', '14.144.0'],
-                'India': ['1.23.0', '14.96.0'],
-                'Singapore': ['8.20.0', '103.10.0'],
-                'Thailand': ['1.46.0', '14.207.0'],
-                'Malaysia': ['1.9.0', '14.102.0']
-            }
-            base_ip = random.choice(ip_ranges.get(country, ['192.168.0']))
-            ip_address = f"{base_ip}.{random.randint(1, 254)}"
+            # Device & Tech
+            'browser_name': browser,
+            'operating_system': os,
+            'screen_resolution': screen_res,
+            'viewport_size': viewport,
+            'timezone': timezone,
             
-            # Segment assignment based on behavior
-            if is_bounce and engagement_score < 30:
-                segment = 'low-engagement'
-            elif engagement_score > 70:
-                segment = 'high-engagement'
-            elif churn_score > 0.7:
-                segment = 'at-risk'
-            elif event_count > 10:
-                segment = 'loyal'
-            elif engagement_score > 50:
-                segment = 'medium-engagement'
-            elif event_count < 3:
-                segment = 'new-visitor'
-            elif churn_score < 0.3 and engagement_score > 40:
-                segment = 're-engaged'
-            else:
-                segment = 'returning'
+            # Marketing Attribution  
+            'utm_source': utm_source,
+            'utm_medium': utm_medium,
+            'utm_campaign': utm_campaign,
             
-            record = {
-                # Original columns
-                'customer_id': None,
-                'known_flag': False,
-                'anon_id': f"ANON_{str(uuid.uuid4()).replace('-', '')[:12].upper()}",
-                'email': None,
-                'phone_number': None,
-                'geo_country': country,
-                'geo_state': state,
-                'geo_city': city,
-                'ip_address': ip_address,
-                'device_type': device_type,
-                'event_count': event_count,
-                'last_event_date': last_event,
-                'segment': segment,
-                
-                # Enhanced columns for anonymous tracking
-                'session_id': f"SESS_{str(uuid.uuid4()).replace('-', '')[:16].upper()}",
-                'session_duration_seconds': int(duration),
-                'page_views': page_views,
-                'is_bounce_session': is_bounce,
-                'avg_time_per_page_seconds': round(avg_time_per_page, 1),
-                'scroll_depth_percent': scroll_depth,
-                'click_count': click_count,
-                
-                # Device & Tech
-                'browser_name': browser,
-                'operating_system': os,
-                'screen_resolution': screen_res,
-                'viewport_size': viewport,
-                'timezone': timezone,
-                
-                # Marketing Attribution  
-                'utm_source': utm_source,
-                'utm_medium': utm_medium,
-                'utm_campaign': utm_campaign,
-                
-                # Behavioral Analytics
-                'engagement_score': engagement_score,
-                'churn_risk_score': churn_score,
-                'conversion_propensity': conversion_propensity,
-                
-                # Event Data
-                'event_sequence_json': event_sequence,
-                'landing_page': 'homepage' if random.random() < 0.4 else random.choice(['product', 'category', 'search']),
-                'referrer_domain': utm_source if utm_source not in ['direct', 'organic'] else None,
-                
-                # Timing
-                'local_visit_hour': random.randint(6, 23),  # Local business hours bias
-                'day_of_week': random.choice(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']),
-                'is_weekend': random.choice(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']) in ['Saturday', 'Sunday']
-            }
+            # Behavioral Analytics
+            'engagement_score': engagement_score,
+            'churn_risk_score': churn_score,
+            'conversion_propensity': conversion_propensity,
             
-            data.append(record)
+            # Event Data
+            'event_sequence_json': event_sequence,
+            'landing_page': np.where(
+                self.rng.random(n) < 0.4,
+                'homepage',
+                self.rng.choice(self.landing_pages, size=n)
+            ).astype(object),
+            'referrer_domain': np.where(np.isin(utm_source, ['direct', 'organic']), None, utm_source),
             
-            if (i + 1) % 1000 == 0:
-                print(f"   Generated {i + 1:,} records...")
-        
-        df = pd.DataFrame(data)
-        
-        print("✅ Enhanced dataset generation complete!")
-        self._print_enhanced_summary(df)
-        
+            # Timing
+            'local_visit_hour': self.rng.integers(6, 24, n),  # Local business hours bias
+            'day_of_week': day_of_week,
+            'is_weekend': np.isin(day_of_week, ('Saturday', 'Sunday'))
+        })
         return df
         
     def _print_enhanced_summary(self, df):
         """Print enhanced dataset summary."""
+        averages = df[['session_duration_seconds', 'page_views', 'is_bounce_session', 'engagement_score']].mean()
+        # Top-5 breakdowns, counted once over the categorical codes
+        top = {col: df[col].value_counts().head() for col in ['geo_country', 'browser_name', 'utm_source']}
         print(f"\n📊 Enhanced Dataset Summary:")
         print(f"   Total records: {len(df):,}")
-        print(f"   Average session duration: {df['session_duration_seconds'].mean():.0f} seconds")
-        print(f"   Average page views: {df['page_views'].mean():.1f}")
-        print(f"   Bounce rate: {df['is_bounce_session'].mean()*100:.1f}%")
-        print(f"   Average engagement score: {df['engagement_score'].mean():.1f}")
+        print(f"   Average session duration: {averages['session_duration_seconds']:.0f} seconds")
+        print(f"   Average page views: {averages['page_views']:.1f}")
+        print(f"   Bounce rate: {averages['is_bounce_session']*100:.1f}%")
+        print(f"   Average engagement score: {averages['engagement_score']:.1f}")
         
         print(f"\n🌏 Top Countries:")
-        for country, count in df['geo_country'].value_counts().head().items():
+        for country, count in top['geo_country'].items():
             print(f"   {country}: {count:,} ({count/len(df)*100:.1f}%)")
             
         print(f"\n📱 Browser Distribution:")
-        for browser, count in df['browser_name'].value_counts().head().items():
+        for browser, count in top['browser_name'].items():
             print(f"   {browser}: {count:,}")
             
         print(f"\n🚀 Traffic Sources:")
-        for source, count in df['utm_source'].value_counts().head().items():
+        for source, count in top['utm_source'].items():
             print(f"   {source}: {count:,}")
 
 
-class EnhancedDatabricksUploader:
+class EnhancedDatabricksUploader(DeltaUploader):
     """Upload enhanced anonymous data to Databricks."""
     
     def __init__(self):
-        load_dotenv()
-        self.server_hostname = "e2-demo-field-eng.cloud.databricks.com"
-        self.http_path = "/sql/1.0/warehouses/ea93d9df50e07dc6"
-        self.access_token = os.getenv("TOKEN")
+        super().__init__("/sql/1.0/warehouses/ea93d9df50e07dc6", label="enhanced", batch_size=10000)
+        
+    def _create_sql(self, full_table_name):
+        """Enhanced table schema."""
+        return f"""
+        CREATE OR REPLACE TABLE {full_table_name} (
+            customer_id STRING,
+            known_flag BOOLEAN,
+            anon_id STRING,
+            email STRING,
+            phone_number STRING,
+            geo_country STRING,
+            geo_state STRING,
+            geo_city STRING,
+            ip_address STRING,
+            device_type STRING,
+            event_count INT,
+            last_event_date TIMESTAMP,
+            segment STRING,
+
+            session_id STRING,
+            session_duration_seconds INT,
+            page_views INT,
+            is_bounce_session BOOLEAN,
+            avg_time_per_page_seconds DOUBLE,
+            scroll_depth_percent TINYINT,
+            click_count INT,
+
+            browser_name STRING,
+            operating_system STRING,
+            screen_resolution STRING,
+            viewport_size STRING,
+            timezone STRING,
+
+            utm_source STRING,
+            utm_medium STRING,
+            utm_campaign STRING,
+
+            engagement_score INT,
+            churn_risk_score DOUBLE,
+            conversion_propensity DOUBLE,
+
+            event_sequence_json STRING,
+            landing_page STRING,
+            referrer_domain STRING,
+
+            local_visit_hour TINYINT,
+            day_of_week STRING,
+            is_weekend BOOLEAN
+        ) USING DELTA
+        """
+        
+    def _staging_table(self, df):
+        """Arrow table in the Delta table's column types."""
+        staged = to_table_types(df)
+        return pa.Table.from_pandas(staged, schema=table_schema(staged), preserve_index=False)
         
     def upload_enhanced_data(self, df, table_name="enhanced_anonymous_360"):
-        """Upload enhanced dataset to Databricks."""
+        """Upload the enhanced dataset to Databricks."""
+        return self.upload_dataframe(df, table_name)
         
-        if not self.access_token:
-            print("❌ TOKEN not found")
-            return False
-            
-        try:
-            print("🔌 Connecting to Databricks...")
-            
-            connection = sql.connect(
-                server_hostname=self.server_hostname,
-                http_path=self.http_path,
-                access_token=self.access_token
-            )
-            
-            cursor = connection.cursor()
-            schema_name = "apscat.di4marketing"
-            full_table_name = f"{schema_name}.{table_name}"
-            
-            print(f"🏗️  Creating enhanced table {full_table_name}...")
-            
-            cursor.execute(f"DROP TABLE IF EXISTS {full_table_name}")
-            
-            # Enhanced table schema
-            create_sql = f"""
-            CREATE TABLE {full_table_name} (
-                customer_id STRING,
-                known_flag BOOLEAN,
-                anon_id STRING,
-                email STRING,
-                phone_number STRING,
-                geo_country STRING,
-                geo_state STRING,
-                geo_city STRING,
-                ip_address STRING,
-                device_type STRING,
-                event_count BIGINT,
-                last_event_date TIMESTAMP,
-                segment STRING,
-                
-                session_id STRING,
-                session_duration_seconds BIGINT,
-                page_views BIGINT,
-                is_bounce_session BOOLEAN,
-                avg_time_per_page_seconds DOUBLE,
-                scroll_depth_percent BIGINT,
-                click_count BIGINT,
-                
-                browser_name STRING,
-                operating_system STRING,
-                screen_resolution STRING,
-                viewport_size STRING,
-                timezone STRING,
-                
-                utm_source STRING,
-                utm_medium STRING,
-                utm_campaign STRING,
-                
-                engagement_score BIGINT,
-                churn_risk_score DOUBLE,
-                conversion_propensity DOUBLE,
-                
-                event_sequence_json STRING,
-                landing_page STRING,
-                referrer_domain STRING,
-                
-                local_visit_hour BIGINT,
-                day_of_week STRING,
-                is_weekend BOOLEAN
-            ) USING DELTA
-            """
-            
-            cursor.execute(create_sql)
-            print("✅ Enhanced table created")
-            
-            # Upload in batches
-            batch_size = 300
-            total_batches = (len(df) + batch_size - 1) // batch_size
-            
-            print(f"📤 Uploading {len(df):,} enhanced records in {total_batches} batches...")
-            
-            for i, batch_start in enumerate(range(0, len(df), batch_size)):
-                batch_end = min(batch_start + batch_size, len(df))
-                batch_df = df.iloc[batch_start:batch_end]
-                
-                values_list = []
-                for _, row in batch_df.iterrows():
-                    values = []
-                    for col in df.columns:
-                        val = row[col]
-                        if pd.isna(val) or val is None:
-                            values.append('NULL')
-                        elif isinstance(val, str):
-                            clean_val = val.replace("'", "''").replace('"', '""')
-                            values.append(f"'{clean_val}'")
-                        elif isinstance(val, bool):
-                            values.append('true' if val else 'false')
-                        elif isinstance(val, pd.Timestamp):
-                            values.append(f"'{val.strftime('%Y-%m-%d %H:%M:%S')}'")
-                        else:
-                            values.append(str(val))
-                    values_list.append(f"({', '.join(values)})")
-                
-                if values_list:
-                    insert_sql = f"INSERT INTO {full_table_name} VALUES " + ', '.join(values_list)
-                    cursor.execute(insert_sql)
-                    print(f"   ✅ Batch {i+1}/{total_batches}")
-            
-            # Verify upload
-            cursor.execute(f"SELECT COUNT(*) FROM {full_table_name}")
-            count = cursor.fetchall()[0][0]
-            
-            cursor.close()
-            connection.close()
-            
-            print(f"🎉 Enhanced upload complete! {count:,} records in {full_table_name}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Enhanced upload failed: {e}")
-            return False
+    def upload_enhanced_parquet(self, path, table_name="enhanced_anonymous_360"):
+        """Upload a Parquet file written by EnhancedAnonymousGenerator.write_parquet."""
+        return self.upload_parquet(path, table_name)
 
 
 def main():
-    """Generate and upload enhanced anonymous dataset."""
+    """Generate and upload enhanced anonymous dataset; returns the dataset."""
     
-    # Generate enhanced dataset
+    # Stream the dataset to the backup file chunk by chunk; the upload loads
+    # the same file, so no SQL text is built when a staging volume is set
     generator = EnhancedAnonymousGenerator(num_records=10000)
-    df = generator.generate_enhanced_dataset()
+    backup_file = "../enhanced_anonymous_customer_data.parquet"
+    generator.write_parquet(backup_file)
+    print(f"💾 Enhanced data saved to {backup_file}")
     
-    # Save backup
-    csv_file = "../enhanced_anonymous_customer_data.csv"
-    df.to_csv(csv_file, index=False)
-    print(f"💾 Enhanced data saved to {csv_file}")
+    # Read the finished file back for the summary and the return value;
+    # categoricals load back as categoricals, so the frame stays compact
+    df = pd.read_parquet(backup_file)
+    generator._print_enhanced_summary(df)
     
     # Upload to Databricks
     uploader = EnhancedDatabricksUploader()
-    success = uploader.upload_enhanced_data(df, "enhanced_anonymous_360")
+    success = uploader.upload_enhanced_parquet(backup_file, "enhanced_anonymous_360")
+    uploader.close()
     
     if success:
         print("🚀 Enhanced anonymous customer data ready in Databricks!")
@@ -6,22 +6,29 @@ Generates comprehensive known customer data with advanced tracking columns and p
 
 import pandas as pd
 import numpy as np
-import random
-import uuid
-import json
-from datetime import datetime, timedelta
+import multiprocessing
+from functools import lru_cache
+from datetime import datetime
 from faker import Faker
 import os
-from dotenv import load_dotenv
-from databricks import sql
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-fake = Faker(['en_AU', 'ja_JP', 'ko_KR', 'zh_CN', 'en_IN'])
+from delta_uploader import DeltaUploader
+from generator_utils import to_table_types, padded_table, hex_ids, ip_addresses, event_sequences
+
+@lru_cache(maxsize=None)
+def _get_faker(locale):
+    """Create each locale's Faker on first use, then reuse it."""
+    return Faker(locale)
 
 class EnhancedKnownGenerator:
     """Generates enhanced known customer data with realistic patterns and personal identifiers."""
     
-    def __init__(self, num_records=90000):
+    def __init__(self, num_records=90000, seed=None):
         self.num_records = num_records
+        # Root of every chunk's seed; pass a seed for reproducible data
+        self.seed = seed
         
         # APJ-focused countries with enhanced locality data
         self.apj_countries = {
@@ -91,14 +98,27 @@ class EnhancedKnownGenerator:
         
         # Device and browser data (same as anonymous)
         self.devices = {
-            'mobile': {'browsers': ['Chrome Mobile', 'Safari Mobile', 'Samsung Internet', 'Firefox Mobile'], 'os': ['Android', 'iOS']},
-            'desktop': {'browsers': ['Chrome', 'Safari', 'Firefox', 'Edge'], 'os': ['Windows', 'macOS', 'Linux']},
-            'tablet': {'browsers': ['Chrome Mobile', 'Safari Mobile'], 'os': ['Android', 'iOS']}
+            'mobile': {'browsers': ['Chrome Mobile', 'Safari Mobile', 'Samsung Internet', 'Firefox Mobile'], 'os': ['Android', 'iOS'],
+                       'screen_resolutions': ['375x667', '414x896', '360x640', '393x851', '428x926']},
+            'desktop': {'browsers': ['Chrome', 'Safari', 'Firefox', 'Edge'], 'os': ['Windows', 'macOS', 'Linux'],
+                        'screen_resolutions': ['1920x1080', '1366x768', '1536x864', '2560x1440', '1440x900']},
+            'tablet': {'browsers': ['Chrome Mobile', 'Safari Mobile'], 'os': ['Android', 'iOS'],
+                       'screen_resolutions': ['768x1024', '1024x768', '820x1180', '810x1080']}
         }
+        self.device_weights = {'mobile': 0.65, 'desktop': 0.25, 'tablet': 0.10}
+        # Mobile and tablet viewports match the screen; desktop windows vary
+        self.desktop_viewports = ['1200x800', '1366x768', '1536x864', '1920x1080']
         
         # Traffic sources (same as anonymous)
         self.utm_sources = ['google', 'facebook', 'instagram', 'linkedin', 'twitter', 'tiktok', 'youtube', 'bing', 'direct', 'organic']
         self.utm_mediums = ['cpc', 'organic', 'social', 'email', 'referral', 'direct', 'display', 'video']
+        self.utm_campaigns = ['customer_retention', 'loyalty_program', 'new_product_launch', 'personalized_offer', 'winback_campaign']
+        
+        # Pages (known customers visit more diverse pages and enter from several)
+        self.page_types = ['homepage', 'product', 'category', 'search', 'cart', 'checkout', 'account', 'help', 'about', 'profile', 'orders', 'wishlist']
+        self.entry_pages = ['homepage', 'account', 'product']
+        self.landing_pages = ['homepage', 'product', 'account', 'category']
+        self.days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         
         # Engagement segments (enhanced for known customers)
         self.segments = ['new-customer', 'returning', 'high-value', 'medium-value', 'low-value', 'vip', 'at-risk', 'loyal', 're-engaged']
@@ -114,6 +134,28 @@ class EnhancedKnownGenerator:
             'Thailand': ['gmail.com', 'yahoo.co.th', 'hotmail.com', 'outlook.co.th'],
             'Malaysia': ['gmail.com', 'yahoo.com.my', 'hotmail.my', 'outlook.my']
         }
+        # Phone number prefix and digit-group ranges by country
+        self.phone_formats = {
+            'Australia': ('+61 4', [(10, 99), (100, 999), (100, 999)]),
+            'Japan': ('+81 90 ', [(1000, 9999), (1000, 9999)]),
+            'South Korea': ('+82 10 ', [(1000, 9999), (1000, 9999)]),
+            'China': ('+86 138 ', [(1000, 9999), (1000, 9999)]),
+            'India': ('+91 98', [(10, 99), (100, 999), (100, 999)]),
+            'Singapore': ('+65 9', [(1000, 9999), (1000, 9999)]),
+            'Thailand': ('+66 8', [(10, 99), (1000, 9999)]),
+            'Malaysia': ('+60 12 ', [(10, 99), (1000, 9999)])
+        }
+        # IP address ranges by country
+        self.ip_ranges = {
+            'Australia': ['1.0.0', '14.0.0'],
+            'Japan': ['126.0.0', '133.0.0'],
+            'South Korea': ['1.201.0', '14.32.0'],
+            'China': ['1.2.0', '14.144.0'],
+            'India': ['1.23.0', '14.96.0'],
+            'Singapore': ['8.20.0', '103.10.0'],
+            'Thailand': ['1.46.0', '14.207.0'],
+            'Malaysia': ['1.9.0', '14.102.0']
+        }
         # Age band definitions and weights (skewed toward younger adults)
         self.age_bands = [
             (18, 24, '18-24'),
@@ -124,6 +166,10 @@ class EnhancedKnownGenerator:
             (65, 99, '65+')
         ]
         self.age_band_weights = [0.28, 0.32, 0.18, 0.12, 0.07, 0.03]  # Skewed toward 18-34
+        # Band bounds and labels as arrays, indexed by band position
+        self._band_lows = np.array([band[0] for band in self.age_bands])
+        self._band_highs = np.array([band[1] for band in self.age_bands])
+        self._band_labels = np.array([band[2] for band in self.age_bands], dtype=object)
         
         # Income level definitions with age-based probability matrices
         self.income_levels = ['budget_conscious', 'mid_tier', 'luxury']
@@ -207,559 +253,658 @@ class EnhancedKnownGenerator:
         self.engagement_behaviors = ['passive', 'browser', 'researcher', 'active_buyer']
         self.price_sensitivities = ['price_conscious', 'value_seeker', 'premium_buyer']
         self.product_interests = ['electronics', 'fashion', 'home_garden', 'health_beauty', 'books_media', 'sports_outdoors']
+        # Engagement behavior by score: below 40, 40-59, 60-79, 80 and up
+        self.engagement_behavior_thresholds = [40, 60, 80]
+        
+        # Price sensitivity by income level
+        self.price_sensitivity_by_income = {
+            'budget_conscious': [0.70, 0.25, 0.05],
+            'mid_tier': [0.30, 0.50, 0.20],
+            'luxury': [0.15, 0.35, 0.50]
+        }
+        
+        # Product interests by life stage (equally likely)
+        self.product_interest_by_life_stage = {
+            'student': ['electronics', 'fashion', 'books_media'],
+            'young_professional': ['electronics', 'fashion', 'health_beauty'],
+            'parent': ['home_garden', 'health_beauty', 'electronics'],
+            'empty_nester': ['home_garden', 'health_beauty', 'sports_outdoors'],
+            'retiree': ['home_garden', 'health_beauty', 'books_media']
+        }
+        
+        # Conditional distributions as CDF matrices, one row per conditioning
+        # value, so every record is drawn at once by indexing rows (_vec_draw).
+        # Rows follow the order of age_bands, income_levels, life_stages and
+        # locality_types.
+        band_labels = [band[2] for band in self.age_bands]
+        self._income_cdf = self._cdf_table([self.income_probabilities[b] for b in band_labels])
+        self._life_stage_cdf = self._cdf_table([self.life_stage_probabilities[b] for b in band_labels])
+        self._purchase_freq_cdf = self._cdf_table([self.purchase_freq_by_income[i] for i in self.income_levels])
+        # Purchase value rows are keyed by band_idx * len(income_levels) + income_idx;
+        # combinations missing from the matrix fall back to the default probabilities
+        self._purchase_value_cdf = self._cdf_table([
+            self.purchase_value_matrix.get((b, i), [0.50, 0.35, 0.15])
+            for b in band_labels for i in self.income_levels
+        ])
+        self._brand_loyalty_cdf = self._cdf_table([self.brand_loyalty_by_life_stage[l] for l in self.life_stages])
+        self._channel_cdf = self._cdf_table([self.channel_by_locality[l] for l in self.locality_types])
+        self._price_sensitivity_cdf = self._cdf_table([self.price_sensitivity_by_income[i] for i in self.income_levels])
+        # Category labels as arrays, indexed by drawn category index
+        self._income_levels = np.array(self.income_levels, dtype=object)
+        self._life_stages = np.array(self.life_stages, dtype=object)
+        self._purchase_frequencies = np.array(self.purchase_frequencies, dtype=object)
+        self._purchase_values = np.array(self.purchase_values, dtype=object)
+        self._brand_loyalties = np.array(self.brand_loyalties, dtype=object)
+        self._shopping_channels = np.array(self.shopping_channels, dtype=object)
+        self._engagement_behaviors = np.array(self.engagement_behaviors, dtype=object)
+        self._price_sensitivities = np.array(self.price_sensitivities, dtype=object)
+        self._product_interest_counts = np.array([len(self.product_interest_by_life_stage[l]) for l in self.life_stages])
+        self._product_interest_table = padded_table([self.product_interest_by_life_stage[l] for l in self.life_stages])
+        
+        # Country lookup tables, indexed by country position; city/state rows
+        # are padded with '' past each country's own count
+        self._country_names = np.array(list(self.apj_countries), dtype=object)
+        weights = np.array([self.apj_countries[c]['weight'] for c in self._country_names], dtype=np.float64)
+        self._country_p = weights / weights.sum()
+        self._timezones = np.array([self.apj_countries[c]['timezone'] for c in self._country_names], dtype=object)
+        self._city_counts = np.array([len(self.apj_countries[c]['cities']) for c in self._country_names])
+        self._state_counts = np.array([len(self.apj_countries[c]['states']) for c in self._country_names])
+        self._city_table = padded_table([self.apj_countries[c]['cities'] for c in self._country_names])
+        self._state_table = padded_table([self.apj_countries[c]['states'] for c in self._country_names])
+        self._ip_counts = np.array([len(self.ip_ranges.get(c, ['192.168.0'])) for c in self._country_names])
+        self._ip_table = padded_table([self.ip_ranges.get(c, ['192.168.0']) for c in self._country_names])
+        # Locality per city slot; '' where the city has no mapping
+        self._city_locality_table = padded_table([
+            [self.apj_countries[c].get('city_types', {}).get(city, '') for city in self.apj_countries[c]['cities']]
+            for c in self._country_names
+        ])
+        
+        # Email domains per country slot and device specs per device type, padded the same way
+        self._domain_table = padded_table([self.email_domains.get(c, ['gmail.com', 'yahoo.com', 'outlook.com']) for c in self._country_names])
+        self._domain_counts = np.array([len(self.email_domains.get(c, ['gmail.com', 'yahoo.com', 'outlook.com'])) for c in self._country_names])
+        self._device_types = np.array(list(self.devices), dtype=object)
+        self._device_p = [self.device_weights[d] for d in self._device_types]
+        self._browser_table = padded_table([self.devices[d]['browsers'] for d in self._device_types])
+        self._browser_counts = np.array([len(self.devices[d]['browsers']) for d in self._device_types])
+        self._os_table = padded_table([self.devices[d]['os'] for d in self._device_types])
+        self._os_counts = np.array([len(self.devices[d]['os']) for d in self._device_types])
+        self._screen_table = padded_table([self.devices[d]['screen_resolutions'] for d in self._device_types])
+        self._screen_counts = np.array([len(self.devices[d]['screen_resolutions']) for d in self._device_types])
+        
+        # Low-cardinality string columns, stored as pandas categoricals
+        self.categorical_columns = [
+            'age_band', 'income_level', 'life_stage', 'locality_type', 'purchase_frequency', 'purchase_value',
+            'brand_loyalty', 'shopping_channel', 'engagement_behavior', 'price_sensitivity', 'product_interest',
+            'geo_country', 'geo_state', 'geo_city', 'device_type', 'segment', 'browser_name', 'operating_system',
+            'screen_resolution', 'viewport_size', 'timezone', 'utm_source', 'utm_medium', 'utm_campaign',
+            'landing_page', 'referrer_domain', 'day_of_week'
+        ]
+        # Bands and tiers are ordered categoricals in their defined order, so
+        # their distributions sort by rank (on the codes) rather than by label
+        self.ordered_categories = {
+            'age_band': [band[2] for band in self.age_bands],
+            'income_level': self.income_levels,
+            'life_stage': self.life_stages,
+            'locality_type': self.locality_types
+        }
+        self.category_dtypes = {col: 'category' for col in self.categorical_columns}
+        self.category_dtypes.update({
+            col: pd.CategoricalDtype(categories, ordered=True) for col, categories in self.ordered_categories.items()
+        })
+        
+        # Smallest integer types that hold each bounded numeric column
+        self.compact_dtypes = {
+            'age': 'int8',                        # 18-99
+            'event_count': 'int16',
+            'session_duration_seconds': 'int16',  # <= 4800
+            'page_views': 'int16',
+            'scroll_depth_percent': 'int8',       # 0-100
+            'click_count': 'int8',                # <= 20
+            'engagement_score': 'int8',           # 0-100
+            'local_visit_hour': 'int8'            # 7-22
+        }
+        
+        # One generator for all column-wise draws; chunks reseed it from self.seed
+        self.rng = np.random.default_rng(seed)
+        
+        # Name pools sampled by index, so Faker is only called pool_size times.
+        # Usernames must be ascii, so names come from the APJ locales that
+        # romanize them (ja/ko/zh names would strip to nothing); any stray
+        # non-ascii characters are still stripped here once.
+        self.name_locales = ['en_AU', 'en_IN']
+        pool_size = min(10000, num_records)
+        fakers = [_get_faker(locale) for locale in self.name_locales]
+        # The Fakers are shared and cached, so seed them from this generator's rng
+        for faker in fakers:
+            faker.seed_instance(int(self.rng.integers(2**32)))
+        self._first_names = np.array([self._ascii(fakers[i % len(fakers)].first_name().lower()) for i in range(pool_size)], dtype=object)
+        self._last_names = np.array([self._ascii(fakers[i % len(fakers)].last_name().lower()) for i in range(pool_size)], dtype=object)
 
-    def _generate_customer_id(self):
-        """Generate realistic customer ID."""
-        # Format: CUST_YYYYMMDD_XXXXXX (date + random)
-        date_part = fake.date_between(start_date='-2y', end_date='now').strftime('%Y%m%d')
-        random_part = f"{random.randint(100000, 999999):06d}"
-        return f"CUST_{date_part}_{random_part}"
-        
-    def _generate_email(self, country):
-        """Generate realistic email address based on country."""
-        domains = self.email_domains.get(country, ['gmail.com', 'yahoo.com', 'outlook.com'])
-        domain = random.choice(domains)
-        # Generate realistic username
-        first_name = fake.first_name().lower()
-        last_name = fake.last_name().lower()
+    def _vec_customer_id(self, n):
+        """Generate realistic customer IDs for n records."""
+        # Format: CUST_YYYYMMDD_XXXXXX (date within the last two years + random)
+        days = self.rng.integers(0, 731, n).astype('timedelta64[D]')
+        date_part = np.char.replace((np.datetime64('today', 'D') - days).astype(str), '-', '')
+        random_part = self.rng.integers(100000, 1000000, n).astype(str)
+        return np.char.add(np.char.add(np.char.add('CUST_', date_part), '_'), random_part).astype(object)
+        
+    def _vec_email(self, country_idx):
+        """Generate realistic email addresses based on each record's country (by index)."""
+        n = len(country_idx)
+        domain = self._domain_table[country_idx, self.rng.integers(0, self._domain_counts[country_idx])]
+        # Generate realistic username from the name pools
+        first_name = self._first_names[self.rng.integers(0, len(self._first_names), n)]
+        last_name = self._last_names[self.rng.integers(0, len(self._last_names), n)]
         # Various email patterns
         patterns = [
-            f"{first_name}.{last_name}",
-            f"{first_name}{last_name}",
-            f"{first_name}.{last_name}{random.randint(1, 99)}",
-            f"{first_name[0]}.{last_name}",
-            f"{first_name}.{last_name[0]}",
-            f"{first_name}{random.randint(1980, 2005)}"
+            first_name + '.' + last_name,
+            first_name + last_name,
+            first_name + '.' + last_name + self.rng.integers(1, 100, n).astype(str).astype(object),
+            first_name.astype('U1').astype(object) + '.' + last_name,
+            first_name + '.' + last_name.astype('U1').astype(object),
+            first_name + self.rng.integers(1980, 2006, n).astype(str).astype(object)
         ]
-        username = random.choice(patterns)
-        # Remove any non-ascii characters for email compatibility
-        username = ''.join(c for c in username if ord(c) < 128)
-        return f"{username}@{domain}"
-        
-    def _generate_phone_number(self, country):
-        """Generate realistic phone number based on country."""
-        phone_patterns = {
-            'Australia': '+61 4{} {} {}',
-            'Japan': '+81 90 {} {}',
-            'South Korea': '+82 10 {} {}',
-            'China': '+86 138 {} {}',
-            'India': '+91 98{} {} {}',
-            'Singapore': '+65 9{} {}',
-            'Thailand': '+66 8{} {}',
-            'Malaysia': '+60 12 {} {}'
-        }
-        pattern = phone_patterns.get(country, '+1 555 {} {}')
-        if country == 'Australia':
-            return pattern.format(
-                f"{random.randint(10, 99):02d}",
-                f"{random.randint(100, 999):03d}",
-                f"{random.randint(100, 999):03d}"
-            )
-        elif country in ['Japan', 'South Korea', 'Singapore']:
-            return pattern.format(
-                f"{random.randint(1000, 9999):04d}",
-                f"{random.randint(1000, 9999):04d}"
-            )
-        elif country == 'China':
-            return pattern.format(
-                f"{random.randint(1000, 9999):04d}",
-                f"{random.randint(1000, 9999):04d}"
-            )
-        elif country in ['Thailand', 'Malaysia']:
-            return pattern.format(
-                f"{random.randint(10, 99):02d}",
-                f"{random.randint(1000, 9999):04d}"
-            )
-        elif country == 'India':
-            return pattern.format(
-                f"{random.randint(10, 99):02d}",
-                f"{random.randint(100, 999):03d}",
-                f"{random.randint(100, 999):03d}"
-            )
-        else:
-            return pattern.format(
-                f"{random.randint(100, 999):03d}",
-                f"{random.randint(1000, 9999):04d}"
-            )
-        
-    def _generate_geo_data(self):
-        """Generate geographic data with timezone and locality type."""
-        countries = list(self.apj_countries.keys())
-        weights = [self.apj_countries[c]['weight'] for c in countries]
-        country = np.random.choice(countries, p=np.array(weights)/sum(weights))
-        country_data = self.apj_countries[country]
-        city = random.choice(country_data['cities'])
-        state = random.choice(country_data['states'])
-        timezone = country_data['timezone']
+        # Pool names are already ascii-only, so usernames need no cleanup
+        username = np.choose(self.rng.integers(0, len(patterns), n), patterns)
+        return username + '@' + domain
+        
+    def _vec_phone_number(self, country):
+        """Generate realistic phone numbers based on each record's country."""
+        phone_number = np.empty(len(country), dtype=object)
+        for c in np.unique(country):
+            idx = np.where(country == c)[0]
+            prefix, ranges = self.phone_formats.get(c, ('+1 555 ', [(100, 999), (1000, 9999)]))
+            groups = [self.rng.integers(lo, hi + 1, idx.size).astype(str) for lo, hi in ranges]
+            number = groups[0]
+            for group in groups[1:]:
+                number = np.char.add(np.char.add(number, ' '), group)
+            phone_number[idx] = np.char.add(prefix, number)
+        return phone_number
+        
+    @staticmethod
+    def _ascii(text):
+        """Drop any non-ascii characters."""
+        return text.encode('ascii', 'ignore').decode('ascii')
+        
+    @staticmethod
+    def _cdf_table(rows):
+        """Stack probability rows into a 2-D array of cumulative sums."""
+        return np.cumsum(np.array(rows, dtype=np.float64), axis=1)
+        
+    def _vec_draw(self, cdf, rows):
+        """Draw one category index per record from the CDF table row given in rows."""
+        u = self.rng.random(len(rows))
+        idx = (cdf[rows] <= u[:, None]).sum(axis=1)
+        # Guard against rows summing to slightly under 1
+        return np.minimum(idx, cdf.shape[1] - 1)
+        
+    def _vec_geo_data(self, n):
+        """Generate geographic data with timezone and locality type for n records.
+        
+        The country index is returned first for indexing other per-country tables.
+        """
+        country_idx = self.rng.choice(len(self._country_names), size=n, p=self._country_p)
+        city_idx = self.rng.integers(0, self._city_counts[country_idx])
+        country = self._country_names[country_idx]
+        city = self._city_table[country_idx, city_idx]
+        state = self._state_table[country_idx, self.rng.integers(0, self._state_counts[country_idx])]
+        timezone = self._timezones[country_idx]
         
         # Get locality type from city mapping or random if not specified
-        if 'city_types' in country_data and city in country_data['city_types']:
-            locality_type = country_data['city_types'][city]
-        else:
-            locality_type = np.random.choice(self.locality_types, p=self.locality_weights)
-        
-        return country, state, city, timezone, locality_type
-        
-    def _generate_device_data(self):
-        """Generate realistic device, browser, and OS data."""
-        device_type = np.random.choice(['mobile', 'desktop', 'tablet'], p=[0.65, 0.25, 0.10])
-        device_info = self.devices[device_type]
-        browser = random.choice(device_info['browsers'])
-        os = random.choice(device_info['os'])
+        locality_type = self._city_locality_table[country_idx, city_idx]
+        unmapped = locality_type == ''
+        locality_type[unmapped] = self.rng.choice(self.locality_types, size=int(unmapped.sum()), p=self.locality_weights)
+        
+        return country_idx, country, state, city, timezone, locality_type
+        
+    def _vec_device_data(self, n):
+        """Generate realistic device, browser, and OS data for n records."""
+        device_idx = self.rng.choice(len(self._device_types), size=n, p=self._device_p)
+        device_type = self._device_types[device_idx]
+        browser = self._browser_table[device_idx, self.rng.integers(0, self._browser_counts[device_idx])]
+        os = self._os_table[device_idx, self.rng.integers(0, self._os_counts[device_idx])]
         # Generate realistic specs
-        if device_type == 'mobile':
-            screen_resolution = random.choice(['375x667', '414x896', '360x640', '393x851', '428x926'])
-            viewport_size = screen_resolution
-        elif device_type == 'desktop':
-            screen_resolution = random.choice(['1920x1080', '1366x768', '1536x864', '2560x1440', '1440x900'])
-            viewport_size = random.choice(['1200x800', '1366x768', '1536x864', '1920x1080'])
-        else:  # tablet
-            screen_resolution = random.choice(['768x1024', '1024x768', '820x1180', '810x1080'])
-            viewport_size = screen_resolution
+        screen_resolution = self._screen_table[device_idx, self.rng.integers(0, self._screen_counts[device_idx])]
+        viewport_size = np.where(
+            device_type == 'desktop',
+            self.rng.choice(np.array(self.desktop_viewports, dtype=object), size=n),
+            screen_resolution
+        )
         return device_type, browser, os, screen_resolution, viewport_size
         
-    def _generate_session_data(self):
-        """Generate realistic session behavior data (known customers tend to engage more)."""
+    def _vec_session_data(self, n):
+        """Generate realistic session behavior data for n records (known customers tend to engage more)."""
         # Known customers have better engagement patterns
-        if random.random() < 0.15:  # 15% bounce (lower than anonymous)
-            duration = random.randint(15, 60)
-            page_views = 1
-            is_bounce = True
-        else:
-            duration = np.random.gamma(3, 150)  # Slightly longer sessions
-            duration = max(45, min(duration, 4800))  # 45sec to 1.3hr
-            page_views = max(2, int(np.random.poisson(4.2)))  # More page views
-            is_bounce = False
+        is_bounce = self.rng.random(n) < 0.15  # 15% bounce (lower than anonymous)
+        duration = np.clip(self.rng.gamma(3, 150, n), 45, 4800)  # Slightly longer sessions, 45sec to 1.3hr
+        duration[is_bounce] = self.rng.integers(15, 61, int(is_bounce.sum()))
+        page_views = np.maximum(2, self.rng.poisson(4.2, n))  # More page views
+        page_views[is_bounce] = 1
         # Calculate derived metrics
-        avg_time_per_page = duration / page_views if page_views > 0 else duration
-        scroll_depth = random.randint(35, 100) if not is_bounce else random.randint(15, 50)
-        click_count = random.randint(1, 3) if is_bounce else random.randint(3, 20)
+        avg_time_per_page = duration / page_views
+        scroll_depth = np.where(is_bounce, self.rng.integers(15, 51, n), self.rng.integers(35, 101, n))
+        click_count = np.where(is_bounce, self.rng.integers(1, 4, n), self.rng.integers(3, 21, n))
         return duration, page_views, is_bounce, avg_time_per_page, scroll_depth, click_count
         
-    def _generate_utm_data(self):
-        """Generate marketing attribution data."""
+    def _vec_utm_data(self, n):
+        """Generate marketing attribution data for n records."""
         # Known customers more likely to come from email/referrals
-        if random.random() < 0.3:
-            utm_source = random.choice(['direct', 'organic'])
-            utm_medium = 'organic' if utm_source == 'organic' else 'direct'
-            utm_campaign = None
-        else:
-            utm_source = random.choice(self.utm_sources)
-            utm_medium = random.choice(self.utm_mediums)
-            campaigns = ['customer_retention', 'loyalty_program', 'new_product_launch', 'personalized_offer', 'winback_campaign']
-            utm_campaign = random.choice(campaigns)
+        is_direct = self.rng.random(n) < 0.3
+        direct_source = self.rng.choice(np.array(['direct', 'organic'], dtype=object), size=n)
+        utm_source = np.where(is_direct, direct_source, self.rng.choice(np.array(self.utm_sources, dtype=object), size=n))
+        utm_medium = np.where(
+            is_direct,
+            np.where(direct_source == 'organic', 'organic', 'direct'),
+            self.rng.choice(np.array(self.utm_mediums, dtype=object), size=n)
+        ).astype(object)
+        utm_campaign = np.where(is_direct, None, self.rng.choice(np.array(self.utm_campaigns, dtype=object), size=n))
         return utm_source, utm_medium, utm_campaign
         
-    def _generate_engagement_scores(self):
-        """Generate realistic engagement and propensity scores (higher for known customers)."""
+    def _vec_engagement_scores(self, n):
+        """Generate realistic engagement and propensity scores for n records (higher for known customers)."""
         # Known customers have higher engagement
-        engagement_score = max(0, min(100, int(np.random.normal(65, 18))))
+        engagement_score = np.clip(self.rng.normal(65, 18, n).astype(np.int64), 0, 100)
         # Lower churn risk for known customers
-        churn_score = np.random.beta(1.5, 6)  # Even more skewed towards lower churn
+        churn_score = self.rng.beta(1.5, 6, n)  # Even more skewed towards lower churn
         # Higher conversion propensity
-        conversion_propensity = np.random.beta(4, 6)  # Better conversion rates
-        return engagement_score, round(churn_score, 3), round(conversion_propensity, 3)
-        
-    def _generate_event_sequence(self, page_views, click_count):
-        """Generate realistic event sequence data."""
-        events = []
-        # Known customers visit more diverse pages
-        page_types = ['homepage', 'product', 'category', 'search','cart', 'checkout', 'account', 'help', 'about', 'profile', 'orders', 'wishlist']
-        
-        for i in range(page_views):
-            if i == 0:
-                page = random.choice(['homepage', 'account', 'product'])  # Multiple entry points
-            else:
-                page = random.choice(page_types)
-            event = {
-                'page': page,
-                'timestamp': fake.date_time_between(start_date='-1h', end_date='now').isoformat(),
-                'duration_seconds': random.randint(15, 450)
-            }
-            events.append(event)
-        return json.dumps(events)
-    
-    def _generate_age_and_band(self):
-        # Choose an age band based on weights
-        band_idx = np.random.choice(len(self.age_bands), p=self.age_band_weights)
-        band = self.age_bands[band_idx]
-        age = random.randint(band[0], band[1])
-        today = datetime.today()
-        dob = today - timedelta(days=age*365 + random.randint(0, 364))
-        return dob.date(), age, band[2]
-    
-    def _generate_income_level(self, age_band):
-        """Generate income level based on age band with realistic distribution."""
-        probabilities = self.income_probabilities[age_band]
-        income_idx = np.random.choice(len(self.income_levels), p=probabilities)
-        return self.income_levels[income_idx]
+        conversion_propensity = self.rng.beta(4, 6, n)  # Better conversion rates
+        return engagement_score, np.round(churn_score, 3), np.round(conversion_propensity, 3)
+        
+    def _vec_segment(self, is_bounce, engagement_score, churn_score, conversion_propensity, event_count):
+        """Assign each record the first matching segment, in priority order."""
+        conditions = [
+            is_bounce & (engagement_score < 30),
+            (engagement_score > 85) & (conversion_propensity > 0.7),
+            engagement_score > 70,
+            churn_score > 0.7,
+            event_count > 10,
+            engagement_score > 50,
+            event_count < 3,
+            (churn_score < 0.3) & (engagement_score > 40)
+        ]
+        choices = ['low-engagement', 'vip', 'high-engagement', 'at-risk', 'loyal',
+                   'medium-engagement', 'new-visitor', 're-engaged']
+        return np.select(conditions, choices, default='returning').astype(object)
     
-    def _generate_life_stage(self, age_band):
-        """Generate life stage based on age band with realistic distribution."""
-        probabilities = self.life_stage_probabilities[age_band]
-        life_stage_idx = np.random.choice(len(self.life_stages), p=probabilities)
-        return self.life_stages[life_stage_idx]
+    def _vec_age_and_band(self, n):
+        """Generate date of birth, age and age band for n records.
+        
+        The band index is returned first for indexing the per-band CDF tables.
+        """
+        # Choose an age band based on weights, then an age within it
+        band_idx = self.rng.choice(len(self.age_bands), size=n, p=self.age_band_weights)
+        age = self.rng.integers(self._band_lows[band_idx], self._band_highs[band_idx] + 1)
+        days = age * 365 + self.rng.integers(0, 365, n)
+        dob = (np.datetime64('today', 'D') - days.astype('timedelta64[D]')).astype(str).astype(object)
+        return band_idx, dob, age, self._band_labels[band_idx]
     
-    def _generate_purchase_behavior(self, age_band, income_level, life_stage, locality_type):
-        """Generate comprehensive purchase behavior based on demographics."""
+    def _vec_demographics(self, band_idx, locality_type):
+        """Generate income, life stage and purchase behavior from each record's age band (by index) and locality.
+        
+        Income and life stage are returned as indices for the behavioral trait tables.
+        """
+        # Demographics based on age
+        income_idx = self._vec_draw(self._income_cdf, band_idx)
+        life_stage_idx = self._vec_draw(self._life_stage_cdf, band_idx)
+        
         # Purchase frequency based on income level
-        freq_probs = self.purchase_freq_by_income[income_level]
-        purchase_frequency = np.random.choice(self.purchase_frequencies, p=freq_probs)
+        purchase_frequency = self._purchase_frequencies[self._vec_draw(self._purchase_freq_cdf, income_idx)]
         
         # Purchase value based on age and income combination
-        value_key = (age_band, income_level)
-        if value_key in self.purchase_value_matrix:
-            value_probs = self.purchase_value_matrix[value_key]
-        else:
-            # Default probabilities if combination not found
-            value_probs = [0.50, 0.35, 0.15]
-        purchase_value = np.random.choice(self.purchase_values, p=value_probs)
+        value_rows = band_idx * len(self.income_levels) + income_idx
+        purchase_value = self._purchase_values[self._vec_draw(self._purchase_value_cdf, value_rows)]
         
         # Brand loyalty based on life stage
-        loyalty_probs = self.brand_loyalty_by_life_stage[life_stage]
-        brand_loyalty = np.random.choice(self.brand_loyalties, p=loyalty_probs)
+        brand_loyalty = self._brand_loyalties[self._vec_draw(self._brand_loyalty_cdf, life_stage_idx)]
         
         # Shopping channel based on locality
-        channel_probs = self.channel_by_locality[locality_type]
-        shopping_channel = np.random.choice(self.shopping_channels, p=channel_probs)
+        locality_idx = pd.Index(self.locality_types).get_indexer(locality_type)
+        shopping_channel = self._shopping_channels[self._vec_draw(self._channel_cdf, locality_idx)]
         
-        return purchase_frequency, purchase_value, brand_loyalty, shopping_channel
+        return income_idx, life_stage_idx, purchase_frequency, purchase_value, brand_loyalty, shopping_channel
     
-    def _generate_behavioral_traits(self, engagement_score, income_level, age_band, life_stage):
-        """Generate behavioral traits based on existing engagement and demographic data."""
+    def _vec_behavioral_traits(self, engagement_score, income_idx, life_stage_idx):
+        """Generate behavioral traits based on existing engagement and demographic (by index) data."""
         # Engagement behavior based on engagement score
-        if engagement_score >= 80:
-            engagement_behavior = 'active_buyer'
-        elif engagement_score >= 60:
-            engagement_behavior = 'researcher'
-        elif engagement_score >= 40:
-            engagement_behavior = 'browser'
-        else:
-            engagement_behavior = 'passive'
-        
-        # Price sensitivity based on income level and life stage
-        if income_level == 'luxury':
-            price_sensitivity = np.random.choice(self.price_sensitivities, p=[0.15, 0.35, 0.50])
-        elif income_level == 'mid_tier':
-            price_sensitivity = np.random.choice(self.price_sensitivities, p=[0.30, 0.50, 0.20])
-        else:  # budget_conscious
-            price_sensitivity = np.random.choice(self.price_sensitivities, p=[0.70, 0.25, 0.05])
-        
-        # Product interest based on age band and life stage
-        if life_stage == 'student':
-            product_interest = np.random.choice(['electronics', 'fashion', 'books_media'])
-        elif life_stage == 'young_professional':
-            product_interest = np.random.choice(['electronics', 'fashion', 'health_beauty'])
-        elif life_stage == 'parent':
-            product_interest = np.random.choice(['home_garden', 'health_beauty', 'electronics'])
-        elif life_stage == 'empty_nester':
-            product_interest = np.random.choice(['home_garden', 'health_beauty', 'sports_outdoors'])
-        else:  # retiree
-            product_interest = np.random.choice(['home_garden', 'health_beauty', 'books_media'])
+        engagement_behavior = self._engagement_behaviors[np.digitize(engagement_score, self.engagement_behavior_thresholds)]
+        
+        # Price sensitivity based on income level
+        price_sensitivity = self._price_sensitivities[self._vec_draw(self._price_sensitivity_cdf, income_idx)]
+        
+        # Product interest based on life stage
+        interest_idx = self.rng.integers(0, self._product_interest_counts[life_stage_idx])
+        product_interest = self._product_interest_table[life_stage_idx, interest_idx]
         
         return engagement_behavior, price_sensitivity, product_interest
     
-    def generate_enhanced_dataset(self):
-        """Generate the complete enhanced known customer dataset."""
+    def generate_enhanced_dataset(self, workers=None):
+        """Generate the complete enhanced known customer dataset.
+        
+        Records are split into chunks generated in parallel worker processes
+        (one per CPU by default, each with at least 10,000 records) and
+        concatenated. Pass workers=1 to generate in-process.
+        """
         print(f"\U0001F3D7️  Generating {self.num_records} enhanced known customer records...")
-        data = []
-        for i in range(self.num_records):
-            # Basic geo and device data
-            country, state, city, timezone, locality_type = self._generate_geo_data()
-            device_type, browser, os, screen_res, viewport = self._generate_device_data()
-            # Customer identification
-            customer_id = self._generate_customer_id()
-            email = self._generate_email(country)
-            phone_number = self._generate_phone_number(country)
-            # Age and band
-            dob, age, age_band = self._generate_age_and_band()
-            # Demographics based on age
-            income_level = self._generate_income_level(age_band)
-            life_stage = self._generate_life_stage(age_band)
-            # Session behavior
-            duration, page_views, is_bounce, avg_time_per_page, scroll_depth, click_count = self._generate_session_data()
-            # Marketing attribution
-            utm_source, utm_medium, utm_campaign = self._generate_utm_data()
-            # Engagement metrics
-            engagement_score, churn_score, conversion_propensity = self._generate_engagement_scores()
-            # Purchase behavior and behavioral traits
-            purchase_frequency, purchase_value, brand_loyalty, shopping_channel = self._generate_purchase_behavior(
-                age_band, income_level, life_stage, locality_type)
-            engagement_behavior, price_sensitivity, product_interest = self._generate_behavioral_traits(
-                engagement_score, income_level, age_band, life_stage)
-            # Event data
-            event_count = max(2, page_views + random.randint(1, 8))  # Known customers have more events
-            last_event = fake.date_time_between(start_date='-30d', end_date='now')  # More recent activity
-            event_sequence = self._generate_event_sequence(page_views, click_count)
-            # IP address (same logic as anonymous)
-            ip_ranges = {
-                'Australia': ['1.0.0', '14.0.0'],
-                'Japan': ['126.0.0', '133.0.0'],
-                'South Korea': ['1.201.0', '14.32.0'],
-                'China': ['1.2.0', '14.144.0'],
-                'India': ['1.23.0', '14.96.0'],
-                'Singapore': ['8.20.0', '103.10.0'],
-                'Thailand': ['1.46.0', '14.207.0'],
-                'Malaysia': ['1.9.0', '14.102.0']
-            }
-            base_ip = random.choice(ip_ranges.get(country, ['192.168.0']))
-            ip_address = f"{base_ip}.{random.randint(1, 254)}"
-            # Enhanced segment assignment for known customers
-            if is_bounce and engagement_score < 30:
-                segment = 'low-engagement'
-            if engagement_score > 85 and conversion_propensity > 0.7:
-                segment = 'vip'
-            elif engagement_score > 70:
-                segment = 'high-engagement'
-            elif churn_score > 0.7:
-                segment = 'at-risk'
-            elif event_count > 10:
-                segment = 'loyal'
-            elif engagement_score > 50:
-                segment = 'medium-engagement'
-            elif event_count < 3:
-                segment = 'new-visitor'
-            elif churn_score < 0.3 and engagement_score > 40:
-                segment = 're-engaged'
-            else:
-                segment = 'returning'
-            record = {
-                # Core identification columns (KEY DIFFERENCE: These are populated)
-                'customer_id': customer_id,
-                'known_flag': True,
-                'anon_id': f"KNOWN_{str(uuid.uuid4()).replace('-', '')[:12].upper()}",
-                'email': email,
-                'phone_number': phone_number,
-                'dob': str(dob),
-                'age': age,
-                'age_band': age_band,
-                'income_level': income_level,
-                'life_stage': life_stage,
-                'locality_type': locality_type,
-                'purchase_frequency': purchase_frequency,
-                'purchase_value': purchase_value,
-                'brand_loyalty': brand_loyalty,
-                'shopping_channel': shopping_channel,
-                'engagement_behavior': engagement_behavior,
-                'price_sensitivity': price_sensitivity,
-                'product_interest': product_interest,
-                'geo_country': country,
-                'geo_state': state,
-                'geo_city': city,
-                'ip_address': ip_address,
-                'device_type': device_type,
-                'event_count': event_count,
-                'last_event_date': last_event,
-                'segment': segment,
-                # Enhanced columns for known customer tracking
-                'session_id': f"SESS_{str(uuid.uuid4()).replace('-', '')[:16].upper()}",
-                'session_duration_seconds': int(duration),
-                'page_views': page_views,
-                'is_bounce_session': is_bounce,
-                'avg_time_per_page_seconds': round(avg_time_per_page, 1),
-                'scroll_depth_percent': scroll_depth,
-                'click_count': click_count,
-                # Device & Tech
-                'browser_name': browser,
-                'operating_system': os,
-                'screen_resolution': screen_res,
-                'viewport_size': viewport,
-                'timezone': timezone,
-                # Marketing Attribution  
-                'utm_source': utm_source,
-                'utm_medium': utm_medium,
-                'utm_campaign': utm_campaign,
-                # Behavioral Analytics
-                'engagement_score': engagement_score,
-                'churn_risk_score': churn_score,
-                'conversion_propensity': conversion_propensity,
-                # Event Data
-                'event_sequence_json': event_sequence,
-                'landing_page': random.choice(['homepage', 'product', 'account', 'category']),
-                'referrer_domain': utm_source if utm_source not in ['direct', 'organic'] else None,
-                # Timing
-                'local_visit_hour': random.randint(7, 22),  # Known customers during business hours
-                'day_of_week': random.choice(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']),
-                'is_weekend': random.choice(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']) in ['Saturday', 'Sunday']
-            }
-            data.append(record)
-            if (i + 1) % 1000 == 0:
-                print(f"   Generated {i + 1:,} known customer records...")
-        df = pd.DataFrame(data)
+        if workers is None:
+            workers = self._default_workers()
+        sizes = [len(chunk) for chunk in np.array_split(np.arange(self.num_records), workers)]
+
+        # Categorize after concat; chunks with differing categories would concat to object
+        df = pd.concat(self._iter_chunks(sizes, workers), ignore_index=True)
+        df = df.astype({**self.compact_dtypes, **self.category_dtypes})
         print("✅ Enhanced known customer dataset generation complete!")
         self._print_enhanced_summary(df)
         return df
+
+    def write_parquet(self, path, chunk_size=10000, workers=None):
+        """Stream the dataset to a Parquet file one chunk at a time.
+
+        Each chunk is written as soon as it is generated and then dropped, so
+        peak memory stays flat however large num_records is. Columns are
+        written in the table's types (see to_table_types), ready for COPY INTO.
+        Returns the number of records written.
+        """
+        print(f"\U0001F3D7️  Streaming {self.num_records} enhanced known customer records to {path}...")
+        if workers is None:
+            workers = self._default_workers()
+        sizes = [min(chunk_size, self.num_records - start) for start in range(0, self.num_records, chunk_size)]
+
+        writer = None
+        written = 0
+        try:
+            for chunk in self._iter_chunks(sizes, workers):
+                # Categoricals are stored as Arrow dictionaries and load back as categoricals
+                staged = to_table_types(chunk).astype(self.category_dtypes)
+                if writer is None:
+                    # Later chunks are cast to the first chunk's schema
+                    schema = pa.Schema.from_pandas(staged, preserve_index=False)
+                    writer = pq.ParquetWriter(path, schema, compression="zstd")
+                writer.write_table(pa.Table.from_pandas(staged, schema=schema, preserve_index=False))
+                written += len(staged)
+                # Report each 10% crossed, not every chunk, so large runs stay readable
+                if written * 10 // self.num_records > (written - len(staged)) * 10 // self.num_records:
+                    print(f"   ✅ {written:,}/{self.num_records:,} records written")
+        finally:
+            if writer is not None:
+                writer.close()
+        print("✅ Enhanced known customer dataset streamed!")
+        return written
+
+    def _default_workers(self):
+        """One worker per CPU, each with at least 10,000 records."""
+        return min(os.cpu_count() or 1, max(1, self.num_records // 10000))
+
+    def _iter_chunks(self, sizes, workers):
+        """Yield one generated chunk per size, in order, with compact dtypes applied.
+
+        Chunk seeds are spawned from self.seed, so a seeded generator repeats
+        its output for the same chunk sizes.
+        """
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        if workers == 1:
+            for size, seed in zip(sizes, seeds):
+                yield self._generate_chunk(size, seed).astype(self.compact_dtypes)
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                # imap hands chunks back in order as they finish, so the
+                # caller's writes overlap generation of the next chunks
+                for chunk in pool.imap(self._generate_seeded_chunk, zip(sizes, seeds)):
+                    yield chunk.astype(self.compact_dtypes)
+
+    def _generate_seeded_chunk(self, size_and_seed):
+        """Pool.imap adapter for _generate_chunk."""
+        return self._generate_chunk(*size_and_seed)
+
+    def _generate_chunk(self, n, seed):
+        """Generate n records seeded from the given SeedSequence.
+        
+        Every column is drawn for all records at once as a NumPy array;
+        fields that cascade from demographics index CDF tables by the
+        records' category indices. The DataFrame is assembled at the end.
+        """
+        # Forked workers inherit identical RNG state; reseed per chunk
+        self.rng = np.random.default_rng(seed)
+        
+        # Basic geo and device data
+        country_idx, country, state, city, timezone, locality_type = self._vec_geo_data(n)
+        device_type, browser, os, screen_res, viewport = self._vec_device_data(n)
+        # Session behavior
+        duration, page_views, is_bounce, avg_time_per_page, scroll_depth, click_count = self._vec_session_data(n)
+        # Marketing attribution
+        utm_source, utm_medium, utm_campaign = self._vec_utm_data(n)
+        # Engagement metrics
+        engagement_score, churn_score, conversion_propensity = self._vec_engagement_scores(n)
+        # Customer identification
+        customer_id = self._vec_customer_id(n)
+        anon_id = hex_ids(self.rng, 'KNOWN_', n, 12)
+        session_id = hex_ids(self.rng, 'SESS_', n, 16)
+        email = self._vec_email(country_idx)
+        phone_number = self._vec_phone_number(country)
+        ip_address = ip_addresses(self.rng, self._ip_table, self._ip_counts, country_idx)
+        # Event data
+        event_count = np.maximum(2, page_views + self.rng.integers(1, 9, n))  # Known customers have more events
+        event_sequence = event_sequences(self.rng, page_views, self.page_types, self.entry_pages, (15, 450))
+        # More recent activity: within the last 30 days
+        last_event_date = np.datetime64(datetime.now(), 's') - self.rng.integers(0, 30 * 86400, n).astype('timedelta64[s]')
+        # Enhanced segment assignment for known customers
+        segment = self._vec_segment(is_bounce, engagement_score, churn_score, conversion_propensity, event_count)
+        # Timing
+        landing_page = self.rng.choice(np.array(self.landing_pages, dtype=object), size=n)
+        local_visit_hour = self.rng.integers(7, 23, n)  # Known customers during business hours
+        day_of_week = self.rng.choice(np.array(self.days_of_week, dtype=object), size=n)
+        is_weekend = np.isin(day_of_week, ('Saturday', 'Sunday'))
+        # Age and band, then the demographics and traits that cascade from them
+        band_idx, dob, age, age_band = self._vec_age_and_band(n)
+        income_idx, life_stage_idx, purchase_frequency, purchase_value, brand_loyalty, shopping_channel = \
+            self._vec_demographics(band_idx, locality_type)
+        engagement_behavior, price_sensitivity, product_interest = self._vec_behavioral_traits(
+            engagement_score, income_idx, life_stage_idx)
+        
+        # Assemble in table column order
+        df = pd.DataFrame({
+            # Core identification columns (KEY DIFFERENCE: These are populated)
+            'customer_id': customer_id,
+            'known_flag': True,
+            'anon_id': anon_id,
+            'email': email,
+            'phone_number': phone_number,
+            'dob': dob,
+            'age': age,
+            'age_band': age_band,
+            'income_level': self._income_levels[income_idx],
+            'life_stage': self._life_stages[life_stage_idx],
+            'locality_type': locality_type,
+            'purchase_frequency': purchase_frequency,
+            'purchase_value': purchase_value,
+            'brand_loyalty': brand_loyalty,
+            'shopping_channel': shopping_channel,
+            'engagement_behavior': engagement_behavior,
+            'price_sensitivity': price_sensitivity,
+            'product_interest': product_interest,
+            'geo_country': country,
+            'geo_state': state,
+            'geo_city': city,
+            'ip_address': ip_address,
+            'device_type': device_type,
+            'event_count': event_count,
+            'last_event_date': last_event_date,
+            'segment': segment,
+            # Enhanced columns for known customer tracking
+            'session_id': session_id,
+            'session_duration_seconds': duration.astype(np.int64),
+            'page_views': page_views,
+            'is_bounce_session': is_bounce,
+            'avg_time_per_page_seconds': np.round(avg_time_per_page, 1),
+            'scroll_depth_percent': scroll_depth,
+            'click_count': click_count,
+            # Device & Tech
+            'browser_name': browser,
+            'operating_system': os,
+            'screen_resolution': screen_res,
+            'viewport_size': viewport,
+            'timezone': timezone,
+            # Marketing Attribution  
+            'utm_source': utm_source,
+            'utm_medium': utm_medium,
+            'utm_campaign': utm_campaign,
+            # Behavioral Analytics
+            'engagement_score': engagement_score,
+            'churn_risk_score': churn_score,
+            'conversion_propensity': conversion_propensity,
+            # Event Data
+            'event_sequence_json': event_sequence,
+            'landing_page': landing_page,
+            'referrer_domain': np.where(np.isin(utm_source, ['direct', 'organic']), None, utm_source),
+            # Timing
+            'local_visit_hour': local_visit_hour,
+            'day_of_week': day_of_week,
+            'is_weekend': is_weekend
+        })
+        return df
         
     def _print_enhanced_summary(self, df):
         """Print enhanced dataset summary."""
+        # Means and distributions are computed once up front; the columns are
+        # categoricals, so each distribution is a count over integer codes
+        averages = df[['session_duration_seconds', 'page_views', 'is_bounce_session', 'engagement_score']].mean()
+        # Top-5 breakdowns, counted once over the categorical codes
+        top = {col: df[col].value_counts().head() for col in ['geo_country', 'browser_name', 'utm_source', 'segment']}
+        shares = {
+            col: df[col].value_counts(normalize=True)
+            for col in ['age_band', 'income_level', 'life_stage', 'locality_type', 'purchase_frequency',
+                        'purchase_value', 'brand_loyalty', 'shopping_channel', 'engagement_behavior',
+                        'price_sensitivity', 'product_interest']
+        }
         print(f"\n📊 Enhanced Known Customer Dataset Summary:")
         print(f"   Total records: {len(df):,}")
-        print(f"   Average session duration: {df['session_duration_seconds'].mean():.0f} seconds")
-        print(f"   Average page views: {df['page_views'].mean():.1f}")
-        print(f"   Bounce rate: {df['is_bounce_session'].mean()*100:.1f}%")
-        print(f"   Average engagement score: {df['engagement_score'].mean():.1f}")
+        print(f"   Average session duration: {averages['session_duration_seconds']:.0f} seconds")
+        print(f"   Average page views: {averages['page_views']:.1f}")
+        print(f"   Bounce rate: {averages['is_bounce_session']*100:.1f}%")
+        print(f"   Average engagement score: {averages['engagement_score']:.1f}")
         print(f"   Age band distribution:")
-        print(df['age_band'].value_counts(normalize=True).sort_index())
+        print(shares['age_band'].sort_index())
         print(f"\n💰 Income Level Distribution:")
-        print(df['income_level'].value_counts(normalize=True).sort_index())
+        print(shares['income_level'].sort_index())
         print(f"\n🎯 Life Stage Distribution:")
-        print(df['life_stage'].value_counts(normalize=True).sort_index())
+        print(shares['life_stage'].sort_index())
         print(f"\n🏢 Locality Type Distribution:")
-        print(df['locality_type'].value_counts(normalize=True).sort_index())
+        print(shares['locality_type'].sort_index())
+        def inline(share):
+            return ', '.join(f"{label}: {value:.3f}" for label, value in share.items())
         print(f"\n🛒 Purchase Behavior Summary:")
-        print(f"   Purchase Frequency: {df['purchase_frequency'].value_counts(normalize=True).to_dict()}")
-        print(f"   Purchase Value: {df['purchase_value'].value_counts(normalize=True).to_dict()}")
-        print(f"   Brand Loyalty: {df['brand_loyalty'].value_counts(normalize=True).to_dict()}")
-        print(f"   Shopping Channel: {df['shopping_channel'].value_counts(normalize=True).to_dict()}")
+        print(f"   Purchase Frequency: {inline(shares['purchase_frequency'])}")
+        print(f"   Purchase Value: {inline(shares['purchase_value'])}")
+        print(f"   Brand Loyalty: {inline(shares['brand_loyalty'])}")
+        print(f"   Shopping Channel: {inline(shares['shopping_channel'])}")
         print(f"\n🎯 Behavioral Traits:")
-        print(f"   Engagement Behavior: {df['engagement_behavior'].value_counts(normalize=True).to_dict()}")
-        print(f"   Price Sensitivity: {df['price_sensitivity'].value_counts(normalize=True).to_dict()}")
-        print(f"   Top Product Interests: {dict(df['product_interest'].value_counts(normalize=True).head(3))}")
+        print(f"   Engagement Behavior: {inline(shares['engagement_behavior'])}")
+        print(f"   Price Sensitivity: {inline(shares['price_sensitivity'])}")
+        print(f"   Top Product Interests: {inline(shares['product_interest'].head(3))}")
         print(f"\n🌏 Top Countries:")
-        for country, count in df['geo_country'].value_counts().head().items():
+        for country, count in top['geo_country'].items():
             print(f"   {country}: {count:,} ({count/len(df)*100:.1f}%)")
         print(f"\n📱 Browser Distribution:")
-        for browser, count in df['browser_name'].value_counts().head().items():
+        for browser, count in top['browser_name'].items():
             print(f"   {browser}: {count:,}")
         print(f"\n🚀 Traffic Sources:")
-        for source, count in df['utm_source'].value_counts().head().items():
+        for source, count in top['utm_source'].items():
             print(f"   {source}: {count:,}")
         print(f"\n👑 Customer Segments:")
-        for segment, count in df['segment'].value_counts().head().items():
+        for segment, count in top['segment'].items():
             print(f"   {segment}: {count:,}")
 
-class EnhancedDatabricksUploader:
+class EnhancedDatabricksUploader(DeltaUploader):
     """Upload enhanced known customer data to Databricks."""
+    
     def __init__(self):
-        load_dotenv()
-        self.server_hostname = "e2-demo-field-eng.cloud.databricks.com"
-        self.http_path = "/sql/1.0/warehouses/862f1d757f0424f7"
-        self.access_token = os.getenv("TOKEN")
+        super().__init__("/sql/1.0/warehouses/862f1d757f0424f7", label="enhanced known customer")
+        
+    def _create_sql(self, full_table_name):
+        """Enhanced table schema."""
+        # Same structure as anonymous but with populated identity fields
+        return f"""
+        CREATE OR REPLACE TABLE {full_table_name} (
+            customer_id STRING,
+            known_flag BOOLEAN,
+            anon_id STRING,
+            email STRING,
+            phone_number STRING,
+            dob DATE,
+            age INT,
+            age_band STRING,
+            income_level STRING,
+            life_stage STRING,
+            locality_type STRING,
+            purchase_frequency STRING,
+            purchase_value STRING,
+            brand_loyalty STRING,
+            shopping_channel STRING,
+            engagement_behavior STRING,
+            price_sensitivity STRING,
+            product_interest STRING,
+            geo_country STRING,
+            geo_state STRING,
+            geo_city STRING,
+            ip_address STRING,
+            device_type STRING,
+            event_count INT,
+            last_event_date TIMESTAMP,
+            segment STRING,
+            session_id STRING,
+            session_duration_seconds INT,
+            page_views INT,
+            is_bounce_session BOOLEAN,
+            avg_time_per_page_seconds DOUBLE,
+            scroll_depth_percent TINYINT,
+            click_count INT,
+            browser_name STRING,
+            operating_system STRING,
+            screen_resolution STRING,
+            viewport_size STRING,
+            timezone STRING,
+            utm_source STRING,
+            utm_medium STRING,
+            utm_campaign STRING,
+            engagement_score INT,
+            churn_risk_score DOUBLE,
+            conversion_propensity DOUBLE,
+            event_sequence_json STRING,
+            landing_page STRING,
+            referrer_domain STRING,
+            local_visit_hour TINYINT,
+            day_of_week STRING,
+            is_weekend BOOLEAN
+        ) USING DELTA
+        """
+        
+    def _staging_table(self, df):
+        """Arrow table in the Delta table's column types."""
+        return pa.Table.from_pandas(to_table_types(df), preserve_index=False)
+        
     def upload_enhanced_data(self, df, table_name="enhanced_known_360"):
-        """Upload enhanced known customer dataset to Databricks."""
-        if not self.access_token:
-            print("❌ TOKEN not found")
-            return False
-        try:
-            print("🔌 Connecting to Databricks...")
-            connection = sql.connect(
-                server_hostname=self.server_hostname,
-                http_path=self.http_path,
-                access_token=self.access_token
-            )
-            cursor = connection.cursor()
-            schema_name = "apscat.di4marketing"
-            full_table_name = f"{schema_name}.{table_name}"
-            print(f"\U0001F3D7️  Creating enhanced known customer table {full_table_name}...")
-            cursor.execute(f"DROP TABLE IF EXISTS {full_table_name}")
-            # Enhanced table schema (same structure as anonymous but with populated identity fields)
-            create_sql = f"""
-            CREATE TABLE {full_table_name} (
-                customer_id STRING,
-                known_flag BOOLEAN,
-                anon_id STRING,
-                email STRING,
-                phone_number STRING,
-                dob DATE,
-                age INT,
-                age_band STRING,
-                income_level STRING,
-                life_stage STRING,
-                locality_type STRING,
-                purchase_frequency STRING,
-                purchase_value STRING,
-                brand_loyalty STRING,
-                shopping_channel STRING,
-                engagement_behavior STRING,
-                price_sensitivity STRING,
-                product_interest STRING,
-                geo_country STRING,
-                geo_state STRING,
-                geo_city STRING,
-                ip_address STRING,
-                device_type STRING,
-                event_count BIGINT,
-                last_event_date TIMESTAMP,
-                segment STRING,
-                session_id STRING,
-                session_duration_seconds BIGINT,
-                page_views BIGINT,
-                is_bounce_session BOOLEAN,
-                avg_time_per_page_seconds DOUBLE,
-                scroll_depth_percent BIGINT,
-                click_count BIGINT,
-                browser_name STRING,
-                operating_system STRING,
-                screen_resolution STRING,
-                viewport_size STRING,
-                timezone STRING,
-                utm_source STRING,
-                utm_medium STRING,
-                utm_campaign STRING,
-                engagement_score BIGINT,
-                churn_risk_score DOUBLE,
-                conversion_propensity DOUBLE,
-                event_sequence_json STRING,
-                landing_page STRING,
-                referrer_domain STRING,
-                local_visit_hour BIGINT,
-                day_of_week STRING,
-                is_weekend BOOLEAN
-            ) USING DELTA
-            """
-            cursor.execute(create_sql)
-            print("✅ Enhanced known customer table created")
-            batch_size = 300
-            total_batches = (len(df) + batch_size - 1) // batch_size
-            print(f"\U0001F4E4 Uploading {len(df):,} enhanced known customer records in {total_batches} batches...")
-            for i, batch_start in enumerate(range(0, len(df), batch_size)):
-                batch_end = min(batch_start + batch_size, len(df))
-                batch_df = df.iloc[batch_start:batch_end]
-                values_list = []
-                for _, row in batch_df.iterrows():
-                    values = []
-                    for col in df.columns:
-                        val = row[col]
-                        if pd.isna(val) or val is None:
-                            values.append('NULL')
-                        elif isinstance(val, str):
-                            clean_val = val.replace("'", "''").replace('"', '""')
-                            values.append(f"'{clean_val}'")
-                        elif isinstance(val, bool):
-                            values.append('true' if val else 'false')
-                        elif isinstance(val, pd.Timestamp):
-                            values.append(f"'{val.strftime('%Y-%m-%d %H:%M:%S')}'")
-                        elif isinstance(val, (pd._libs.tslibs.nattype.NaTType, type(None))):
-                            values.append('NULL')
-                        else:
-                            values.append(str(val))
-                    values_list.append(f"({', '.join(values)})")
-                if values_list:
-                    insert_sql = f"INSERT INTO {full_table_name} VALUES " + ', '.join(values_list)
-                    cursor.execute(insert_sql)
-                    print(f"   ✅ Batch {i+1}/{total_batches}")
-            cursor.execute(f"SELECT COUNT(*) FROM {full_table_name}")
-            count = cursor.fetchall()[0][0]
-            cursor.close()
-            connection.close()
-            print(f"🎉 Enhanced known customer upload complete! {count:,} records in {full_table_name}")
-            return True
-        except Exception as e:
-            print(f"❌ Enhanced known customer upload failed: {e}")
-            return False
+        """Upload the enhanced dataset to Databricks."""
+        return self.upload_dataframe(df, table_name)
+        
+    def upload_enhanced_parquet(self, path, table_name="enhanced_known_360"):
+        """Upload a Parquet file written by EnhancedKnownGenerator.write_parquet."""
+        return self.upload_parquet(path, table_name)
 
 def main():
-    """Generate and upload enhanced known customer dataset."""
+    """Generate and upload enhanced known customer dataset; returns the dataset."""
     # Generate enhanced known customer dataset
+    # Stream to the backup file chunk by chunk; the full dataset is never in memory
     generator = EnhancedKnownGenerator(num_records=90000)
-    df = generator.generate_enhanced_dataset()
-    # Save backup
-    csv_file = "../enhanced_known_customer_data.csv"
-    df.to_csv(csv_file, index=False)
-    print(f"💾 Enhanced known customer data saved to {csv_file}")
-    # Upload to Databricks
+    backup_file = "../enhanced_known_customer_data.parquet"
+    generator.write_parquet(backup_file)
+    print(f"💾 Enhanced known customer data saved to {backup_file}")
+    # Read the finished file back for the summary and the return value;
+    # categoricals load back as categoricals, so the frame stays compact
+    df = pd.read_parquet(backup_file)
+    generator._print_enhanced_summary(df)
+    # Upload the backup file to Databricks
     uploader = EnhancedDatabricksUploader()
-    success = uploader.upload_enhanced_data(df, "enhanced_known_360")
+    success = uploader.upload_enhanced_parquet(backup_file, "enhanced_known_360")
+    uploader.close()
     if success:
         print("🚀 Enhanced known customer data ready in Databricks!")
         print("   Table: apscat.di4marketing.enhanced_known_360")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Generator Utilities
+Column builders and Delta table typing shared by the enhanced generators.
+"""
+
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Integer columns' types in the Delta tables (INT / TINYINT); all values fit in 32 bits
+TABLE_INT_TYPES = {
+    'age': 'int32',
+    'event_count': 'int32',
+    'session_duration_seconds': 'int32',
+    'page_views': 'int32',
+    'scroll_depth_percent': 'int8',
+    'click_count': 'int32',
+    'engagement_score': 'int32',
+    'local_visit_hour': 'int8'
+}
+
+
+def to_table_types(df):
+    """Cast generated columns to the table's INT, TINYINT and DATE types so COPY INTO needs no casts.
+
+    Only the columns present in df are cast, so both generators' frames fit.
+    """
+    df = df.astype({col: dtype for col, dtype in TABLE_INT_TYPES.items() if col in df.columns})
+    if 'dob' in df.columns:
+        df = df.assign(dob=pd.to_datetime(df['dob']).dt.date)
+    return df
+
+
+def padded_table(rows):
+    """Stack ragged lists of strings into a 2-D object array padded with ''."""
+    width = max(len(row) for row in rows)
+    return np.array([list(row) + [''] * (width - len(row)) for row in rows], dtype=object)
+
+
+def hex_ids(rng, prefix, n, length):
+    """Generate n random uppercase hex IDs of the given (even) length from one rng.bytes call."""
+    digits = rng.bytes(n * length // 2).hex().upper()
+    return np.array([prefix + digits[i:i + length] for i in range(0, n * length, length)], dtype=object)
+
+
+def ip_addresses(rng, ip_table, ip_counts, country_idx):
+    """Generate an IP address from each record's country (by index) ranges.
+
+    ip_table is a padded_table of each country's /24 prefixes and ip_counts
+    the number of prefixes in each row.
+    """
+    n = len(country_idx)
+    base_ip = ip_table[country_idx, rng.integers(0, ip_counts[country_idx])]
+    return base_ip + '.' + rng.integers(1, 255, n).astype(str).astype(object)
+
+
+def event_sequences(rng, page_views, page_types, entry_pages, duration_range):
+    """Generate realistic event sequence JSON, one list of page_views events per record.
+
+    Each session's first event is drawn from entry_pages and the rest from
+    page_types; durations are drawn from the inclusive duration_range.
+    """
+    # Sample every event across all records at once; bounds[i]:bounds[i+1] are record i's events
+    bounds = np.concatenate(([0], np.cumsum(page_views)))
+    total_events = int(bounds[-1])
+    is_entry = np.zeros(total_events, dtype=bool)
+    is_entry[bounds[:-1][page_views > 0]] = True
+    pages = np.where(
+        is_entry,
+        rng.choice(np.array(entry_pages, dtype=object), total_events),
+        rng.choice(np.array(page_types, dtype=object), total_events)
+    )
+    # Timestamps within the last hour
+    now = np.datetime64(datetime.now(), 's')
+    timestamps = (now - rng.integers(0, 3600, total_events).astype('timedelta64[s]')).astype(str)
+    durations = rng.integers(duration_range[0], duration_range[1] + 1, total_events)
+
+    events = [
+        {'page': page, 'timestamp': timestamp, 'duration_seconds': duration}
+        for page, timestamp, duration in zip(pages.tolist(), timestamps.tolist(), durations.tolist())
+    ]
+    if orjson is not None:
+        return [orjson.dumps(events[start:end]).decode() for start, end in zip(bounds[:-1], bounds[1:])]
+    return [json.dumps(events[start:end], separators=(',', ':')) for start, end in zip(bounds[:-1], bounds[1:])]
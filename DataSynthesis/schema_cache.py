@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Table Schema Cache
+In-process TTL cache for DESCRIBE results, which rarely change between queries.
+"""
+
+import re
+import time
+from typing import Any, Callable, Dict, NamedTuple
+
+
+class _Entry(NamedTuple):
+    value: Any
+    fetched_at: float
+
+
+# DDL statements that change a table's schema, capturing the table name
+DDL_TABLE_PATTERN = re.compile(
+    r"^\s*(?:CREATE(?:\s+OR\s+REPLACE)?|ALTER|DROP|REPLACE)\s+TABLE\s+"
+    r"(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([\w.`]+)",
+    re.IGNORECASE
+)
+
+
+class SchemaCache:
+    """Caches table schemas with a TTL.
+    
+    Misses and expired entries are fetched synchronously by the caller, so
+    fetch_fn always runs on the caller's thread and connection.
+    """
+    
+    def __init__(self, ttl: float = 30.0):
+        """Initialize with entry lifetime in seconds."""
+        self.ttl = ttl
+        self._entries: Dict[str, _Entry] = {}
+        
+    @staticmethod
+    def _key(table_name: str) -> str:
+        return table_name.replace("`", "").lower()
+        
+    def get(self, table_name: str, fetch_fn: Callable[[], Any]) -> Any:
+        """Return the cached schema for a table, calling fetch_fn on a miss."""
+        key = self._key(table_name)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.fetched_at < self.ttl:
+            return entry.value
+            
+        value = fetch_fn()
+        if value is not None:
+            self._entries[key] = _Entry(value, time.monotonic())
+        return value
+        
+    def invalidate(self, table_name: str):
+        """Drop the cached schema for a table."""
+        self._entries.pop(self._key(table_name), None)
+        
+    def invalidate_for_statement(self, statement: str):
+        """Drop the cached schema of any table a DDL statement modifies."""
+        match = DDL_TABLE_PATTERN.match(statement)
+        if match:
+            self.invalidate(match.group(1))